@@ -1,7 +1,198 @@
+import errno
 import os
 import shutil
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def copy_to_leaf_folders(source_file_path, root_folder_path):
+try:
+    import fcntl
+except ImportError: # Windows; only the Linux copy path needs it
+    fcntl = None
+
+# In-kernel file-to-file copies (copy_file_range / sendfile) are Linux-only;
+# every other platform keeps using shutil.copy2.
+_COPY_IN_KERNEL = sys.platform.startswith("linux")
+
+# Copies are I/O-bound and release the GIL inside the kernel, so oversubscribe the CPUs.
+_COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# How each leaf receives the file: a full copy, a hardlink to the source, or a
+# copy-on-write reflink. Links fall back to a copy when the filesystem can't do them.
+COPY_MODES = ("copy", "hardlink", "reflink")
+
+# FICLONE ioctl request number from linux/fs.h: share all of src_fd's extents with dst_fd
+_FICLONE = 0x40049409
+
+# Sources smaller than this are read into memory once and written to every leaf,
+# so the read side is paid a single time.
+_SMALL_FILE_THRESHOLD = 4 << 20
+
+# Streamed leaf output is flushed every this many successful copies.
+_FLUSH_EVERY = 1024
+
+# Errors that mean "this syscall can't copy between these two files", as
+# opposed to a real I/O failure.
+_COPY_FALLBACK_ERRNOS = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+# Errors that mean a hardlink isn't possible here (other filesystem, no link support,
+# link count limit) and a copy should be made instead.
+_LINK_FALLBACK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+def _write_all(fd, data):
+    """Writes all of data to fd, retrying on short writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def _copy_fd_contents(src_fd, dst_fd, size):
+    """
+    Copies size bytes from the start of src_fd to dst_fd without moving src_fd's offset.
+
+    Tries copy_file_range first (which can reflink on btrfs/xfs), then sendfile,
+    then a plain pread/write loop.
+
+    Args:
+        src_fd (int): Open, readable descriptor of the source file.
+        dst_fd (int): Open, writable descriptor positioned at the start of the destination.
+        size (int): Number of bytes to copy.
+    """
+    offset = 0
+
+    # offset_dst is left as None so dst_fd's position advances and any later
+    # fallback simply continues where this one stopped.
+    try:
+        while offset < size:
+            copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset)
+            if copied == 0:
+                return
+            offset += copied
+        return
+    except OSError as e:
+        if e.errno not in _COPY_FALLBACK_ERRNOS:
+            raise
+
+    try:
+        while offset < size:
+            copied = os.sendfile(dst_fd, src_fd, offset, size - offset)
+            if copied == 0:
+                return
+            offset += copied
+        return
+    except OSError as e:
+        if e.errno not in _COPY_FALLBACK_ERRNOS:
+            raise
+
+    while offset < size:
+        chunk = os.pread(src_fd, min(1 << 20, size - offset), offset)
+        if not chunk:
+            return
+        _write_all(dst_fd, chunk)
+        offset += len(chunk)
+
+def _link_file(source_file_path, destination_file_path):
+    """
+    Hardlinks the source to a destination path, replacing any existing file there.
+
+    Returns:
+        bool: True if the link was made, False if a regular copy is needed instead.
+    """
+    try:
+        os.link(source_file_path, destination_file_path)
+        return True
+    except FileExistsError:
+        if os.path.samefile(source_file_path, destination_file_path):
+            return True # Already linked (or it is the source itself)
+        os.unlink(destination_file_path)
+    except OSError as e:
+        if e.errno in _LINK_FALLBACK_ERRNOS:
+            return False
+        raise
+
+    try:
+        os.link(source_file_path, destination_file_path)
+        return True
+    except OSError as e:
+        if e.errno in _LINK_FALLBACK_ERRNOS:
+            return False
+        raise
+
+def _copy_file(src_fd, src_st, destination_file_path, src_bytes=None, reflink=False):
+    """
+    Copies an already-open source file to a destination path, preserving mode and timestamps.
+
+    Args:
+        src_fd (int): Open, readable descriptor of the source file.
+        src_st (os.stat_result): Stat of the source file, taken once by the caller.
+        destination_file_path (str): The path to write the copy to.
+        src_bytes (bytes): The source contents, if the caller already has them in memory.
+        reflink (bool): Try a copy-on-write clone (FICLONE) before copying any data.
+    """
+    # Not opened with O_TRUNC: if the destination is the source itself, truncating
+    # would destroy it. Mirror shutil.copy2 and refuse instead.
+    dst_fd = os.open(destination_file_path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        dst_st = os.fstat(dst_fd)
+        if (dst_st.st_dev, dst_st.st_ino) == (src_st.st_dev, src_st.st_ino):
+            raise shutil.SameFileError(f"'{destination_file_path}' is the source file")
+        os.ftruncate(dst_fd, 0)
+
+        cloned = False
+        if reflink:
+            try:
+                fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+                cloned = True
+            except OSError as e:
+                if e.errno not in _COPY_FALLBACK_ERRNOS and e.errno != errno.ENOTTY:
+                    raise
+
+        if cloned:
+            pass
+        elif src_bytes is not None:
+            _write_all(dst_fd, src_bytes)
+        else:
+            _copy_fd_contents(src_fd, dst_fd, src_st.st_size)
+        os.fchmod(dst_fd, stat.S_IMODE(src_st.st_mode))
+        os.utime(dst_fd, ns=(src_st.st_atime_ns, src_st.st_mtime_ns))
+    finally:
+        os.close(dst_fd)
+
+def _walk_leaves(path):
+    """
+    Yields every leaf directory at or below a path, in top-down order.
+
+    Entries are classified with os.scandir's cached d_type, so no extra stat
+    call is issued per entry, and only directory-ness is ever checked. Symlinks
+    are never followed.
+
+    Args:
+        path (str): The directory to start from.
+    """
+    # Explicit stack instead of recursion: no recursion limit on deep trees, and each
+    # leaf is yielded directly rather than through one generator frame per level.
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+        except OSError:
+            # Mirror os.walk: unreadable directories are skipped silently
+            continue
+
+        if not subdirs:
+            yield current
+        else:
+            # Reversed so subdirectories are visited in scandir order
+            subdirs.reverse()
+            stack.extend(subdirs)
+
+def copy_to_leaf_folders(source_file_path, root_folder_path, small_file_threshold=_SMALL_FILE_THRESHOLD,
+                         mode="copy"):
     """
     Copies a source file to all leaf subdirectories within a root folder.
 
@@ -10,8 +201,18 @@ def copy_to_leaf_folders(source_file_path, root_folder_path):
     Args:
         source_file_path (str): The path to the file to be copied.
         root_folder_path (str): The path to the root folder to search within.
+        small_file_threshold (int): Sources smaller than this many bytes are held in memory
+            and written to each leaf instead of being re-read per copy.
+        mode (str): One of COPY_MODES. "hardlink" and "reflink" fall back to a
+            regular copy wherever the filesystem can't link.
     """
     # --- Input Validation ---
+    # The source and root themselves may be symlinks and are followed; nothing below
+    # the root is.
+    if mode not in COPY_MODES:
+        print(f"Error: Unknown copy mode '{mode}'. Expected one of: {', '.join(COPY_MODES)}.")
+        return
+
     if not os.path.isfile(source_file_path):
         print(f"Error: Source file '{source_file_path}' not found or is not a file.")
         return
@@ -20,30 +221,90 @@ def copy_to_leaf_folders(source_file_path, root_folder_path):
         print(f"Error: Root folder '{root_folder_path}' not found or is not a directory.")
         return
 
-    copied_to_folders = [] # To store paths of folders where the file was copied
+    # --- Source Setup ---
+    # The source is opened and stat'ed once and the descriptor is reused for every leaf.
+    src_fd = None
+    src_st = None
+    src_bytes = None
+    if _COPY_IN_KERNEL:
+        try:
+            src_fd = os.open(source_file_path, os.O_RDONLY)
+            src_st = os.fstat(src_fd)
+            if src_st.st_size < small_file_threshold and mode == "copy":
+                src_bytes = os.pread(src_fd, src_st.st_size, 0)
+                if len(src_bytes) != src_st.st_size:
+                    src_bytes = None # Changed under us; copy from the descriptor instead
+            elif mode == "copy":
+                # Start readahead now; every leaf copy reads the same pages. Links and
+                # reflinks share extents instead of reading data, so they skip it.
+                os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError as e:
+            print(f"Error opening source file '{source_file_path}': {e}")
+            if src_fd is not None:
+                os.close(src_fd)
+            return
 
-    # --- Recursive Traversal ---
-    # os.walk generates the directory names, subdirectory names, and file names
-    # for each directory in the tree, in a top-down manner.
-    for dirpath, dirnames, filenames in os.walk(root_folder_path):
-        # Check if the current directory (dirpath) has no subdirectories
-        if not dirnames:  # This means it's a leaf folder
-            try:
-                # Construct the full destination path for the file
-                destination_file_path = os.path.join(dirpath, os.path.basename(source_file_path))
+    # Loop invariants, computed once instead of per leaf
+    base = os.path.basename(source_file_path)
+    sep = os.sep
 
-                # Copy the file
-                # shutil.copy2 attempts to preserve all file metadata
+    # Leaf folders are written out as they complete rather than collected in a list,
+    # so memory stays flat however wide the tree is. Output and the counter are
+    # shared by the worker threads.
+    output_lock = threading.Lock()
+    write = sys.stdout.write
+    copied_count = 0
+
+    # Caps the number of leaves queued in the pool, so a walker that runs ahead of
+    # the copies doesn't buffer the whole tree either.
+    slots = threading.BoundedSemaphore(_COPY_WORKERS * 4)
+
+    def copy_one(dirpath):
+        """Copies the source into one leaf folder and reports the result."""
+        nonlocal copied_count
+        try:
+            # Construct the full destination path for the file
+            # (a doubled separator, when the root itself is a leaf given with a
+            # trailing slash, is harmless)
+            destination_file_path = f"{dirpath}{sep}{base}"
+
+            # Link or copy the file
+            # Every copy path preserves permission bits and access/modification times
+            if mode == "hardlink" and _link_file(source_file_path, destination_file_path):
+                pass
+            elif src_fd is not None:
+                _copy_file(src_fd, src_st, destination_file_path, src_bytes, reflink=(mode == "reflink"))
+            else:
                 shutil.copy2(source_file_path, destination_file_path)
-                copied_to_folders.append(dirpath)
-            except Exception as e:
+        except Exception as e:
+            with output_lock:
                 print(f"Error copying to '{dirpath}': {e}")
+            return
+        finally:
+            slots.release()
+
+        with output_lock:
+            write(f"{dirpath}\n")
+            copied_count += 1
+            if copied_count % _FLUSH_EVERY == 0:
+                sys.stdout.flush()
+
+    # --- Recursive Traversal + Parallel Copy ---
+    # _walk_leaves only yields directories that have no subdirectories. Each leaf is
+    # handed to the pool as soon as it is found, so copying overlaps the traversal.
+    print(f"\nCopying '{base}' to the following leaf folders:")
+    try:
+        with ThreadPoolExecutor(max_workers=_COPY_WORKERS) as executor:
+            for dirpath in _walk_leaves(root_folder_path):
+                slots.acquire()
+                executor.submit(copy_one, dirpath)
+    finally:
+        if src_fd is not None:
+            os.close(src_fd)
 
     # --- Output ---
-    if copied_to_folders:
-        print(f"\nFile '{os.path.basename(source_file_path)}' copied to the following leaf folders:")
-        for folder in copied_to_folders:
-            print(folder)
+    if copied_count:
+        print(f"\nFile '{base}' copied to {copied_count} leaf folder(s).")
     else:
         print(f"\nNo leaf folders found in '{root_folder_path}', or an error occurred during copying.")
 
@@ -58,7 +319,10 @@ if __name__ == "__main__":
     # Get the path to the root folder
     target_root_folder = input("Enter the full path of the root folder to process: ").strip()
 
+    # Get how the file should be placed in each leaf
+    copy_mode = input(f"Enter the copy mode ({'/'.join(COPY_MODES)}) [copy]: ").strip() or "copy"
+
     # Call the function to perform the copy operation
-    copy_to_leaf_folders(source_file, target_root_folder)
+    copy_to_leaf_folders(source_file, target_root_folder, mode=copy_mode)
 
     print("\n--- Operation Complete ---")
@@ -1,14 +1,18 @@
 # main.py
 import argparse
+import atexit
 import json
 import logging
+import logging.handlers
 import os
 import pathlib
+import queue
 import shutil
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import docker # type: ignore
-from projectProcess import ProjectProcessor
+from projectProcess import ATOM_DOCKER_IMAGE, ContainerPool, ProjectProcessor, json_loads
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -20,6 +24,56 @@ logger = logging.getLogger(__name__)
 DEFAULT_INPUT_DIR = "atom_inputs"
 DEFAULT_OUTPUT_DIR = "atom_outputs"
 DEFAULT_WORKSPACE_DIR = "atom_workspace" # For cloning repos and intermediate files
+# Concurrent container starts scale well up to roughly this many
+DEFAULT_PREWARM_PARALLELISM = 8
+CONFIG_LOAD_WORKERS = 16
+DEFAULT_MAX_PARALLEL = min(16, os.cpu_count() or 1)
+# Workers for the container teardown pool
+CLEANUP_WORKERS = 4
+# Docker API calls a project can have in flight at once (its JAR and native runs)
+DOCKER_CALLS_PER_PROJECT = 2
+
+
+def _start_log_listener():
+    """
+    Moves the configured log handlers onto a listener thread, so project threads only
+    enqueue records instead of contending for the handlers' locks and stream writes.
+    The listener drains and stops at exit.
+    """
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def _discover_project_configs(input_dir: pathlib.Path) -> list[pathlib.Path]:
+    """Finds INPUT_DIR/Language/ProjectName/project_config.json files, sorted by path."""
+    config_files = []
+    # DirEntry.is_dir(follow_symlinks=False) answers from the d_type readdir already
+    # returned, so only the final config-file check costs a stat
+    with os.scandir(input_dir) as lang_it:
+        for lang_entry in lang_it:
+            if not lang_entry.is_dir(follow_symlinks=False):
+                continue
+            with os.scandir(lang_entry.path) as proj_it:
+                for proj_entry in proj_it:
+                    if not proj_entry.is_dir(follow_symlinks=False):
+                        continue
+                    config_file = os.path.join(proj_entry.path, "project_config.json")
+                    if os.path.isfile(config_file):
+                        config_files.append(pathlib.Path(config_file))
+    config_files.sort()
+    return config_files
+
+
+def _read_project_config(config_path: pathlib.Path) -> tuple[pathlib.Path, dict | None]:
+    """Parses one project config; errors are left for ProjectProcessor to report."""
+    try:
+        return config_path, json_loads(config_path.read_bytes())
+    except (OSError, json.JSONDecodeError):
+        return config_path, None
 
 
 def main():
@@ -38,83 +92,149 @@ def main():
     parser.add_argument("--skip-native", action="store_true", help="Skip running atom Native version.")
     parser.add_argument("--skip-compare", action="store_true", help="Skip comparison using custom-json-diff.")
     parser.add_argument("--keep-containers", action="store_true", help="Do not remove containers after processing (for debugging).")
+    parser.add_argument("--verify-docker", action="store_true", help="Ping the Docker daemon at startup before processing any project.")
+    parser.add_argument("--max-parallel", type=int, default=DEFAULT_MAX_PARALLEL,
+                        help=f"Number of projects to process concurrently (default: {DEFAULT_MAX_PARALLEL})")
+    parser.add_argument("--prewarm-parallelism", type=int, default=DEFAULT_PREWARM_PARALLELISM,
+                        help=f"Containers to start concurrently when pre-warming the pool; 0 disables pre-warming (default: {DEFAULT_PREWARM_PARALLELISM})")
 
 
     args = parser.parse_args()
+    _start_log_listener()
+
+    # Validate --project before any directories or Docker connections are set up
+    project_parts = None
+    if args.project:
+        project_parts = args.project.split("/", 1)
+        if len(project_parts) != 2 or not all(project_parts):
+            logger.error("--project must be Language/ProjectName, got: %s", args.project)
+            return
 
     # Ensure directories exist
     args.input_dir.mkdir(parents=True, exist_ok=True)
     args.output_dir.mkdir(parents=True, exist_ok=True)
     args.workspace_dir.mkdir(parents=True, exist_ok=True)
 
-    logger.info(f"Input directory: {args.input_dir.resolve()}")
-    logger.info(f"Output directory: {args.output_dir.resolve()}")
-    logger.info(f"Workspace directory: {args.workspace_dir.resolve()}")
-
+    # resolve() hits the filesystem, so only do it when the lines will be emitted
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Input directory: %s", args.input_dir.resolve())
+        logger.info("Output directory: %s", args.output_dir.resolve())
+        logger.info("Workspace directory: %s", args.workspace_dir.resolve())
+
+    # One client, and so one connection pool, is shared by every processor, pool start
+    # and teardown. Sized so concurrent calls never open throwaway connections beyond
+    # docker-py's default of 10.
+    docker_pool_size = max(10, DOCKER_CALLS_PER_PROJECT * max(1, args.max_parallel) + CLEANUP_WORKERS,
+                           args.prewarm_parallelism)
     try:
-        docker_client = docker.from_env()
-        docker_client.ping() # Test connection
-        logger.info("Docker client initialized and connected.")
+        docker_client = docker.from_env(max_pool_size=docker_pool_size)
+        if args.verify_docker:
+            docker_client.ping() # Test connection
+            logger.info("Docker client initialized and connected.")
+        else:
+            # Connection problems surface on the first real API call instead
+            logger.info("Docker client initialized.")
     except Exception as e:
-        logger.error(f"Failed to initialize Docker client: {e}")
+        logger.error("Failed to initialize Docker client: %s", e)
         logger.error("Please ensure Docker is running and accessible.")
         return
 
     project_config_files = []
-    if args.project:
-        lang, proj_name = args.project.split('/', 1)
-        path = args.input_dir / lang / proj_name / "project_config.json"
-        if path.is_file():
+    if project_parts:
+        lang, proj_name = project_parts
+        path = pathlib.Path(os.path.join(args.input_dir, lang, proj_name, "project_config.json"))
+        if os.path.isfile(path):
             project_config_files.append(path)
         else:
-            logger.error(f"Specified project config not found: {path}")
+            logger.error("Specified project config not found: %s", path)
             return
     else:
-        for lang_dir in args.input_dir.iterdir():
-            if lang_dir.is_dir():
-                for project_dir in lang_dir.iterdir():
-                    if project_dir.is_dir():
-                        config_file = project_dir / "project_config.json"
-                        if config_file.is_file():
-                            project_config_files.append(config_file)
+        project_config_files = _discover_project_configs(args.input_dir)
 
     if not project_config_files:
-        logger.warning(f"No project configuration files found in {args.input_dir}.")
+        logger.warning("No project configuration files found in %s.", args.input_dir)
         logger.warning("Expected structure: INPUT_DIR/Language/ProjectName/project_config.json")
         return
 
-    logger.info(f"Found {len(project_config_files)} project(s) to process.")
-
-    overall_success = True
-    for config_path in project_config_files:
-        processor = None 
+    logger.info("Found %d project(s) to process.", len(project_config_files))
+
+    # Parse every config up front in one concurrent batch
+    with ThreadPoolExecutor(max_workers=CONFIG_LOAD_WORKERS) as executor:
+        project_configs = dict(executor.map(_read_project_config, project_config_files))
+
+    # Group projects by image so consecutive projects pick up the same warm container
+    def image_then_path(config_path: pathlib.Path) -> tuple[str, str]:
+        config = project_configs.get(config_path)
+        image = config.get("container_image", ATOM_DOCKER_IMAGE) if isinstance(config, dict) else ""
+        return image, config_path.as_posix()
+    project_config_files.sort(key=image_then_path)
+
+    # Warm containers reused across projects via docker exec. Processors check a
+    # container out for their whole run and hand it back afterwards.
+    container_pool = ContainerPool(docker_client, args.workspace_dir, args.output_dir)
+    if not args.keep_containers:
+        atexit.register(container_pool.close)
+
+    if args.prewarm_parallelism > 0:
+        # One container per project that can run at once, per image
+        max_parallel = max(1, args.max_parallel)
+        image_counts = {}
+        for config in project_configs.values():
+            if isinstance(config, dict):
+                image = config.get("container_image", ATOM_DOCKER_IMAGE)
+                image_counts[image] = min(image_counts.get(image, 0) + 1, max_parallel)
+        container_pool.prewarm(image_counts, args.prewarm_parallelism)
+
+    def run_one(config_path: pathlib.Path) -> tuple[bool, str]:
+        """Processes a single project and reports whether it succeeded."""
+        processor = None
+        ok = False
         try:
-            processor = ProjectProcessor(config_path, args.input_dir, args.workspace_dir, args.output_dir, docker_client)
-
-            if args.skip_cloning: processor._clone_repo = lambda: True
-            if args.skip_docker_tools_install: processor.tools_installed_in_container = True 
-
-            if not processor.process():
-                logger.error(f"Processing failed for {processor.project_lang}/{processor.project_name}")
-                overall_success = False
+            processor = ProjectProcessor(config_path, args.input_dir, args.workspace_dir, args.output_dir, docker_client,
+                                         container_pool=container_pool,
+                                         preloaded_config=project_configs.get(config_path),
+                                         skip_cloning=args.skip_cloning,
+                                         skip_tools_install=args.skip_docker_tools_install)
+
+            ok = processor.process(cleanup=False)
+            if not ok:
+                logger.error("Processing failed for %s", processor.project_label)
             
         except ValueError as ve: 
-            logger.error(f"Skipping project due to config error: {config_path} - {ve}")
-            overall_success = False
+            logger.error("Skipping project due to config error: %s - %s", config_path, ve)
+        except (docker.errors.APIError, OSError) as e:
+            logger.error("Error setting up processor for %s: %s", config_path, e,
+                         exc_info=logger.isEnabledFor(logging.DEBUG))
         except Exception as e:
-            logger.error(f"Critical error setting up processor for {config_path}: {e}", exc_info=True)
-            overall_success = False
+            logger.error("Critical error setting up processor for %s: %s", config_path, e, exc_info=True)
         finally:
             if processor and args.keep_containers and processor.container:
-                logger.info(f"Keeping container {processor.container_name} as per --keep-containers flag.")
+                logger.info("Keeping container %s as per --keep-containers flag.", processor.container.name)
             elif processor and not args.keep_containers:
-                 processor._cleanup_container()
+                # Stop/remove takes seconds; let the next project start meanwhile
+                cleanup_pool.submit(processor._cleanup_container)
+        return ok, f"{config_path.parent.parent.name}/{config_path.parent.name}"
 
+    # Projects spend most of their time waiting on Docker, so threads overlap them well.
+    # Container teardown runs on its own small pool, off the projects' critical path.
+    cleanup_pool = ThreadPoolExecutor(max_workers=CLEANUP_WORKERS)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.max_parallel)) as executor:
+            futures = [executor.submit(run_one, config_path) for config_path in project_config_files]
+            results = []
+            for future in as_completed(futures):
+                ok, name = future.result()
+                results.append((ok, name))
+                logger.info("[%s/%s] %s: %s", len(results), len(futures), name, 'succeeded' if ok else 'failed')
+    finally:
+        cleanup_pool.shutdown(wait=True)
+    overall_success = all(ok for ok, _ in results)
 
     if overall_success:
         logger.info("All projects processed successfully.")
     else:
-        logger.warning("One or more projects failed during processing.")
+        failed = ", ".join(name for ok, name in results if not ok)
+        logger.warning("One or more projects failed during processing: %s", failed)
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,79 @@
 # main.py
 import argparse
+import atexit
+import collections
+import contextlib
+import functools
+import hashlib
+import io
 import json
 import logging
+import multiprocessing
 import os
 import pathlib
+import posixpath
+import queue
+import re
+import shlex
 import shutil
 import subprocess
+import tarfile
+import threading
 import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
 import docker
+import docker.utils.socket
+
+try:
+    # orjson parses several times faster than the stdlib; its JSONDecodeError subclasses json's
+    import orjson
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+try:
+    from custom_json_diff.lib import custom_diff, custom_diff_classes
+except ImportError: # Diffs then go through the cjd command line instead
+    custom_diff = custom_diff_classes = None
+
+
+class _OrjsonRoundTrip:
+    """
+    Stands in for the json module inside cjd's custom_diff, whose loader round-trips
+    every parsed document through json.dumps(sort_keys=True) and json.loads to put its
+    keys in order. orjson does both steps several times faster. Anything else, and
+    values orjson can't encode (e.g. integers beyond 64 bits), goes to the stdlib.
+    """
+
+    def __getattr__(self, name):
+        return getattr(json, name)
+
+    @staticmethod
+    def dumps(obj, sort_keys=False, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+            except TypeError:
+                pass
+        return json.dumps(obj, sort_keys=sort_keys, **kwargs)
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return json.loads(s, **kwargs) if kwargs else orjson.loads(s)
+
+
+# The single seam where orjson enters the in-process diffs; cjd's own loaders still run
+if custom_diff is not None and orjson is not None:
+    custom_diff.json = _OrjsonRoundTrip()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -17,9 +83,485 @@ logger = logging.getLogger(__name__)
 
 # --- Configuration ---
 ATOM_DOCKER_IMAGE = "ghcr.io/appthreat/atom:latest"
+# Optional pull-through cache / mirror host that image references are rewritten to
+ATOM_IMAGE_REGISTRY_MIRROR_ENV = "ATOM_IMAGE_REGISTRY_MIRROR"
 ATOM_NATIVE_IMAGE_URL_LINUX = "https://github.com/AppThreat/atom/releases/latest/download/atom-amd64"
 ATOM_NATIVE_IMAGE_NAME_LINUX = "atom-amd64"
 ATOM_NATIVE_EXECUTABLE_NAME = "atom-native"
+ATOM_NPM_PACKAGES = "@appthreat/atom @cyclonedx/cdxgen --omit=optional @appthreat/atom-parsetools"
+# Timeout for host-side downloads of the atom native binary
+NATIVE_DOWNLOAD_TIMEOUT = 300
+# Local repository for images committed after a successful tool install
+ATOM_PREPARED_IMAGE_REPOSITORY = "atom-prepared"
+# Upper bound on containers being created at once across all threads; beyond this
+# the daemon mostly contends with itself
+MAX_CONCURRENT_CONTAINER_STARTS = 8
+_container_start_slots = threading.BoundedSemaphore(MAX_CONCURRENT_CONTAINER_STARTS)
+# Ends the name of every container this run creates. The random part keeps runs that
+# start in the same second against one daemon (e.g. parallel CI jobs) apart.
+CONTAINER_NAME_SUFFIX = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
+# Parallel submodule fetches during clone; override per project with "clone_jobs"
+DEFAULT_CLONE_JOBS = os.cpu_count() or 4
+# How long a freshly started container may take to accept execs
+CONTAINER_READY_TIMEOUT = 10.0
+# Read size when streaming archives out of a container
+ARCHIVE_STREAM_BUFFER_SIZE = 1 << 20
+# The whole workspace is mounted here so one container can serve every project
+CONTAINER_WORKSPACE_MOUNT = "/workspace"
+# The whole output dir is mounted here so atom can write results straight to the host
+CONTAINER_OUTPUT_MOUNT = "/out"
+# Per-executable scratch space for atom outputs that stay in the container, so JAR and
+# native runs going on side by side don't overwrite each other's app.atom. Kept on the
+# workspace mount: atom files can outgrow the /tmp tmpfs below.
+CONTAINER_SCRATCH_ROOT = f"{CONTAINER_WORKSPACE_MOUNT}/.atom-scratch"
+# RAM-backed mounts for npm's cache and other small-file churn, which is slow on overlay2.
+# Nothing under them ends up in a committed prepared image (npm -g installs elsewhere).
+CONTAINER_TMPFS = {"/root/.npm": "size=512m", "/tmp": "size=1g"}
+CONTAINER_ENVIRONMENT = {"npm_config_cache": "/root/.npm", "npm_config_prefer_offline": "true"}
+# One JSON line per diffed file (file, status, diff path) under each project's diff_results
+DIFF_INDEX_NAME = "diffs.ndjson"
+# Touched in a project's output dir once both atom runs have fully succeeded; outputs
+# newer than the source tree, config and native binary are reused without a run
+OUTPUTS_COMPLETE_STAMP = ".atom-outputs-complete"
+# Native atom operations run this many at a time; override per project with "max_parallel_ops"
+DEFAULT_MAX_PARALLEL_ATOM_OPS = 2
+
+# The host-side native binary cache is shared by all processors in this run and is
+# revalidated against the server at most once per run
+_native_fetch_lock = threading.Lock()
+_native_fetched: dict[str, str] = {} # tar path -> sha256 of the binary
+
+# IDs of images and containers already known to have the atom tools, so the
+# `command -v` probe runs at most once per image or container in a run. Image IDs
+# are content digests, so a re-pulled or re-committed image gets a fresh probe.
+_tools_present_lock = threading.Lock()
+_tools_present_ids: set[str] = set()
+
+# In-process diffs are pure-Python CPU work, so they run in worker processes shared by
+# all processors. The pool is started on first use, with spawn since the orchestrator
+# is multi-threaded by then.
+DIFF_WORKERS = os.cpu_count() or 1
+_diff_executor_lock = threading.Lock()
+_diff_executor: ProcessPoolExecutor | None = None
+
+
+def _get_diff_executor() -> ProcessPoolExecutor:
+    global _diff_executor
+    with _diff_executor_lock:
+        if _diff_executor is None:
+            _diff_executor = ProcessPoolExecutor(max_workers=DIFF_WORKERS,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_diff_executor.shutdown, wait=True)
+        return _diff_executor
+
+
+def _run_in_diff_worker(fn, *args):
+    """
+    Runs fn(*args) on the diff pool. A worker that dies (e.g. OOM on a huge SBOM)
+    breaks the whole pool, so a broken pool is replaced and the call retried once;
+    a second BrokenProcessPool is raised.
+    """
+    global _diff_executor
+    for attempt in range(2):
+        executor = _get_diff_executor()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            with _diff_executor_lock:
+                # Another thread may already have replaced it
+                if _diff_executor is executor:
+                    _diff_executor = None
+            executor.shutdown(wait=False)
+            if attempt:
+                raise
+            logger.warning("A diff worker process died; restarting the diff pool.")
+
+# Fingerprint of the atom JAR package and native binary, per container ID
+_tool_fingerprint_lock = threading.Lock()
+_tool_fingerprints: dict[str, str] = {}
+
+# Prints the native binary's checksum and the atom npm package's package.json, which
+# together identify the versions of both atom executables in a container
+TOOL_FINGERPRINT_SCRIPT = (
+    f'sha256sum "$(command -v {ATOM_NATIVE_EXECUTABLE_NAME})" && '
+    'd=$(dirname "$(readlink -f "$(command -v atom)")") && '
+    'while [ "$d" != / ] && [ ! -f "$d/package.json" ]; do d=$(dirname "$d"); done && '
+    'cat "$d/package.json"'
+)
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of bytes chunks, such as a get_archive stream."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+class ShellSessionLost(Exception):
+    """A shell session broke after a command was sent; the command may still be running."""
+
+
+class ShellSession:
+    """
+    One long-lived `sh` exec in a container that many small commands are written to,
+    instead of creating, starting and inspecting a new exec for each of them.
+
+    Each command runs in a subshell with stdin closed, so `exit`, `set -e` or a stray
+    read can't take the session down, and is followed by an echo of a numbered
+    sentinel carrying its exit code.
+    """
+
+    def __init__(self, api_client, container_id: str):
+        self._api = api_client
+        self._container_id = container_id
+        self._socket = None
+        self._count = 0
+
+    def __enter__(self):
+        exec_id = self._api.exec_create(self._container_id, ["sh"], stdin=True, stdout=True, stderr=True)["Id"]
+        self._socket = self._api.exec_start(exec_id, socket=True, demux=False)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._socket is None:
+            return
+        try:
+            self._send(b"exit\n")
+        except OSError:
+            pass
+        finally:
+            self._socket.close()
+            self._socket = None
+
+    def _send(self, data: bytes):
+        # exec_start hands back a SocketIO wrapper; writes go to the raw socket under it
+        getattr(self._socket, "_sock", self._socket).sendall(data)
+
+    def run(self, command: str, workdir: str | None = None) -> tuple[int, str, str]:
+        """
+        Runs one shell command and returns (exit_code, stdout, stderr). Raises OSError
+        if the command couldn't be sent, and ShellSessionLost if the session broke after
+        it was, in which case it must not simply be run again elsewhere.
+        """
+        self._count += 1
+        marker = f"__DONE_{self._count}__ ".encode()
+        if workdir:
+            command = f"cd {shlex.quote(workdir)} && {command}"
+        self._send(f"( {command}\n) </dev/null\necho {marker.decode()}$?\n".encode())
+        try:
+            return self._read_result(marker)
+        except (OSError, ValueError) as e:
+            raise ShellSessionLost(f"{type(e).__name__}: {e}") from e
+
+    def _read_result(self, marker: bytes) -> tuple[int, str, str]:
+        """Collects a sent command's output up to its sentinel line."""
+        # Without a TTY the stream is multiplexed: each frame says whether it is stdout or stderr.
+        # Only the newly arrived tail (plus enough overlap for a split marker) is searched,
+        # so long outputs aren't rescanned frame after frame.
+        stdout, stderr = bytearray(), bytearray()
+        start = -1
+        while True:
+            stream, size = docker.utils.socket.next_frame_header(self._socket)
+            if size < 0:
+                raise ConnectionError("Shell session closed before the command finished")
+            payload = docker.utils.socket.read_exactly(self._socket, size) if size else b""
+            if stream == docker.utils.socket.STDERR:
+                stderr += payload
+                continue
+            stdout += payload
+            if start < 0:
+                start = stdout.find(marker, max(0, len(stdout) - len(payload) - len(marker)))
+                if start < 0:
+                    continue
+                end = stdout.find(b"\n", start + len(marker))
+            else:
+                end = stdout.find(b"\n", len(stdout) - len(payload))
+            if end < 0:
+                continue
+            exit_code = int(stdout[start + len(marker):end])
+            return (exit_code, stdout[:start].decode('utf-8', errors='replace'),
+                    stderr.decode('utf-8', errors='replace'))
+
+
+class _JoinedArgs:
+    """Log argument that space-joins a command's parts only if the record is actually formatted."""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def __str__(self) -> str:
+        return " ".join(map(str, self.parts))
+
+
+@functools.lru_cache(maxsize=None)
+def _resolved_host_path(path: pathlib.Path) -> str:
+    """
+    Absolute, symlink-free string form of a host directory, resolved once per run. The
+    workspace and output dirs are re-used for every container start and output mapping.
+    """
+    return os.fspath(path.resolve())
+
+
+def resolve_image(image: str) -> str:
+    """
+    Rewrites an image reference to go through the registry mirror named by
+    $ATOM_IMAGE_REGISTRY_MIRROR (e.g. a local pull-through cache), if set.
+    "ghcr.io/appthreat/atom:latest" becomes "<mirror>/appthreat/atom:latest".
+
+    For Docker Hub images the daemon-wide "registry-mirrors" setting in
+    /etc/docker/daemon.json does the same without any rewriting.
+    """
+    mirror = os.environ.get(ATOM_IMAGE_REGISTRY_MIRROR_ENV, "").strip().rstrip("/")
+    if not mirror:
+        return image
+
+    first, _, rest = image.partition("/")
+    # The first path component is a registry host if it looks like one
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        image = rest
+    return f"{mirror}/{image}"
+
+
+def fetch_native_image(workspace_dir: pathlib.Path) -> tuple[pathlib.Path, str] | None:
+    """
+    Downloads the atom native binary into the workspace cache (revalidating it with
+    its ETag, once per run) and wraps it in a tar whose single member is the executable
+    with mode 0755, ready for put_archive. Returns the tar path and the binary's sha256,
+    or None if unavailable.
+    """
+    cache_dir = workspace_dir / ".cache"
+    binary_path = cache_dir / ATOM_NATIVE_EXECUTABLE_NAME
+    etag_path = cache_dir / f"{ATOM_NATIVE_EXECUTABLE_NAME}.etag"
+    tar_path = cache_dir / f"{ATOM_NATIVE_EXECUTABLE_NAME}.tar"
+
+    with _native_fetch_lock:
+        if str(tar_path) in _native_fetched:
+            return tar_path, _native_fetched[str(tar_path)]
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        request = urllib.request.Request(ATOM_NATIVE_IMAGE_URL_LINUX)
+        if tar_path.exists() and etag_path.exists():
+            request.add_header("If-None-Match", etag_path.read_text().strip())
+
+        try:
+            logger.info("Fetching atom native image from %s...", ATOM_NATIVE_IMAGE_URL_LINUX)
+            with urllib.request.urlopen(request, timeout=NATIVE_DOWNLOAD_TIMEOUT) as response:
+                partial_path = cache_dir / f"{ATOM_NATIVE_EXECUTABLE_NAME}.part"
+                with open(partial_path, 'wb') as f:
+                    shutil.copyfileobj(response, f, ARCHIVE_STREAM_BUFFER_SIZE)
+                os.chmod(partial_path, 0o755)
+                os.replace(partial_path, binary_path)
+                etag = response.headers.get("ETag")
+            if etag:
+                etag_path.write_text(etag)
+            else:
+                etag_path.unlink(missing_ok=True)
+
+            partial_tar = cache_dir / f"{ATOM_NATIVE_EXECUTABLE_NAME}.tar.part"
+            with tarfile.open(partial_tar, 'w') as tar:
+                info = tar.gettarinfo(binary_path, arcname=ATOM_NATIVE_EXECUTABLE_NAME)
+                info.mode = 0o755
+                info.uid = info.gid = 0
+                info.uname = info.gname = "root"
+                with open(binary_path, 'rb') as f:
+                    tar.addfile(info, f)
+            os.replace(partial_tar, tar_path)
+            logger.info("Atom native image downloaded to %s.", binary_path)
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                logger.error("Failed to download atom native image: %s", e)
+                return None
+            logger.info("Cached atom native image is up to date.")
+        except (urllib.error.URLError, OSError) as e:
+            if not tar_path.exists():
+                logger.error("Failed to download atom native image: %s", e)
+                return None
+            logger.warning("Could not revalidate atom native image (%s); using cached copy.", e)
+
+        try:
+            with open(binary_path, 'rb') as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+        except OSError as e:
+            logger.error("Failed to read atom native image: %s", e)
+            return None
+        _native_fetched[str(tar_path)] = digest
+        return tar_path, digest
+
+
+def prepared_image_name(base_image_id: str, native_digest: str) -> str:
+    """
+    Name of the local image holding the base image with the atom tools already installed.
+    The tag changes whenever the base image's ID, the npm package spec or the native
+    binary's content changes, so a re-pulled base or a new native release gets a fresh one.
+    """
+    cache_key = hashlib.sha256(
+        "\n".join([base_image_id, ATOM_NPM_PACKAGES, native_digest]).encode()).hexdigest()[:16]
+    return f"{ATOM_PREPARED_IMAGE_REPOSITORY}:{cache_key}"
+
+
+def start_idle_container(docker_client, image: str, name: str, workspace_dir: pathlib.Path,
+                         output_dir: pathlib.Path | None = None,
+                         working_dir: str = CONTAINER_WORKSPACE_MOUNT):
+    """
+    Starts an idle container with the workspace (and output dir, if given) mounted. A previously committed
+    prepared image for the local base image and the current native binary is used when one exists;
+    otherwise `image` is pulled if missing.
+    A stopped leftover container already holding `name` is removed first; a running one is left alone.
+    Raises docker.errors.APIError on failure.
+    """
+    image = resolve_image(image)
+    native = fetch_native_image(workspace_dir)
+    try:
+        prepared = prepared_image_name(docker_client.images.get(image).id, native[1]) if native else None
+        if prepared:
+            docker_client.images.get(prepared)
+            image = prepared
+            logger.info("Using prepared image %s.", image)
+    except docker.errors.ImageNotFound:
+        # containers.run pulls the base image itself when the daemon doesn't have it,
+        # so a first run is still a single create + start
+        pass
+
+    volumes = {_resolved_host_path(workspace_dir): {'bind': CONTAINER_WORKSPACE_MOUNT, 'mode': 'rw'}}
+    if output_dir is not None:
+        volumes[_resolved_host_path(output_dir)] = {'bind': CONTAINER_OUTPUT_MOUNT, 'mode': 'rw'}
+
+    with _container_start_slots:
+        for attempt in range(2):
+            try:
+                return docker_client.containers.run(
+                    image,
+                    name=name,
+                    volumes=volumes,
+                    tmpfs=CONTAINER_TMPFS,
+                    environment=CONTAINER_ENVIRONMENT,
+                    working_dir=working_dir,
+                    command="sleep infinity",
+                    detach=True,
+                    auto_remove=False
+                )
+            except docker.errors.APIError as e:
+                # Names are unique per run, so a conflict is a leftover from an earlier
+                # one; it is only replaced if it isn't running, in case it is still in use
+                if attempt or e.status_code != 409:
+                    raise
+                try:
+                    if docker_client.api.inspect_container(name)["State"].get("Running"):
+                        raise
+                    logger.warning("Container %s already exists. Removing the stale container.", name)
+                    docker_client.api.remove_container(name, force=True)
+                except docker.errors.NotFound:
+                    pass
+
+
+class AtomRunResult(NamedTuple):
+    """Outcome of running a project's atom operations with one executable."""
+    ok: bool # Every operation succeeded
+    succeeded: int # Operations that succeeded and whose outputs reached the host
+
+    @property
+    def no_baseline(self) -> bool:
+        """Nothing at all was produced, so there is nothing to compare the other run against."""
+        return not self.ok and self.succeeded == 0
+
+
+class ContainerPool:
+    """
+    Long-lived idle containers, keyed by image, that projects check out for their whole
+    run via acquire() and hand back via release(), so container creation, image lookup
+    and tool installation stay off each project's critical path. Thread-safe.
+    """
+
+    def __init__(self, docker_client, workspace_dir: pathlib.Path, output_dir: pathlib.Path | None = None):
+        self.docker_client = docker_client
+        self.workspace_dir = workspace_dir
+        self.output_dir = output_dir
+        self._idle: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, image: str):
+        """Checks out a running idle container for image, or returns None if there is none."""
+        while True:
+            with self._lock:
+                idle = self._idle.get(image)
+                container = idle.pop() if idle else None
+            if container is None:
+                return None
+            try:
+                container.reload()
+                if container.status == "running":
+                    logger.info("Reusing pooled container '%s' for image '%s'.", container.name, image)
+                    return container
+                logger.warning("Pooled container '%s' is no longer running. Discarding it.", container.name)
+                container.remove(force=True)
+            except docker.errors.NotFound:
+                pass
+            except docker.errors.APIError as e:
+                logger.warning("Error discarding pooled container '%s': %s", container.name, e)
+
+    def release(self, image: str, container):
+        """Returns a checked-out container to the pool."""
+        logger.info("Returning container '%s' to the pool.", container.name)
+        with self._lock:
+            self._idle.setdefault(image, []).append(container)
+
+    def prewarm(self, image_counts: dict[str, int], parallelism: int):
+        """Starts image_counts[image] idle containers per image, parallelism at a time."""
+        todo = [(image, i) for image, count in sorted(image_counts.items()) for i in range(count)]
+        if not todo:
+            return
+        logger.info("Pre-warming %s container(s) with parallelism %s...", len(todo), parallelism)
+
+        def start(indexed):
+            index, (image, _) = indexed
+            try:
+                return image, start_idle_container(self.docker_client, image, f"atom_pool_{index}_{CONTAINER_NAME_SUFFIX}",
+                                                   self.workspace_dir, output_dir=self.output_dir)
+            except docker.errors.APIError as e:
+                logger.warning("Failed to pre-warm container for image %s: %s", image, e)
+                return image, None
+
+        with ThreadPoolExecutor(max_workers=max(1, parallelism)) as executor:
+            for image, container in executor.map(start, enumerate(todo)):
+                if container is not None:
+                    with self._lock:
+                        self._idle.setdefault(image, []).append(container)
+                    logger.info("Pre-warmed container '%s' for image %s.", container.name, image)
+
+    def close(self):
+        """Force-removes every idle container left in the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for image, containers in idle.items():
+            for container in containers:
+                try:
+                    logger.info("Removing pooled container '%s' (%s)...", container.name, image)
+                    container.remove(force=True)
+                except docker.errors.NotFound:
+                    pass
+                except docker.errors.APIError as e:
+                    logger.error("Error removing pooled container '%s': %s", container.name, e)
+
 
 class ProjectProcessor:
     """
@@ -30,17 +572,26 @@ class ProjectProcessor:
                  base_input_dir: pathlib.Path,
                  base_workspace_dir: pathlib.Path,
                  base_output_dir: pathlib.Path,
-                 docker_client):
+                 docker_client,
+                 container_pool: ContainerPool | None = None,
+                 preloaded_config: dict | None = None,
+                 skip_cloning: bool = False,
+                 skip_tools_install: bool = False):
         self.project_config_path = project_config_path
         self.base_input_dir = base_input_dir
         self.base_workspace_dir = base_workspace_dir
         self.base_output_dir = base_output_dir
         self.docker_client = docker_client
+        # Shared warm containers that outlive this processor. A container is checked
+        # out for the whole project and handed back on cleanup.
+        self.container_pool = container_pool
 
         self.project_lang = project_config_path.parent.parent.name
         self.project_name = project_config_path.parent.name
+        # "Language/ProjectName", built once for the log lines that name the project
+        self.project_label = f"{self.project_lang}/{self.project_name}"
         
-        self.config = self._load_config()
+        self.config = self._load_config(preloaded_config)
         if not self.config:
             raise ValueError(f"Failed to load or validate config: {project_config_path}")
 
@@ -49,270 +600,595 @@ class ProjectProcessor:
         self.jar_output_dir = self.project_output_path / "jar_output"
         self.native_output_dir = self.project_output_path / "native_output"
         self.diff_dir = self.project_output_path / "diff_results"
+        # Only per-status counts of this run's diffs are kept in memory; the per-file
+        # records are appended to the diff index as they happen
+        self.diff_counts = collections.Counter()
+        self._diff_index_lock = threading.Lock()
 
-        self.container_name = f"atom_processor_{self.project_lang.lower()}_{self.project_name.lower()}_{int(time.time())}"
+        self.container_image = self.config.get("container_image", ATOM_DOCKER_IMAGE)
+        self.container_source_path = f"{CONTAINER_WORKSPACE_MOUNT}/{self.project_lang}/{self.project_name}/source"
+
+        self.container_name = f"atom_processor_{self.project_lang.lower()}_{self.project_name.lower()}_{CONTAINER_NAME_SUFFIX}"
         self.container = None
-        self.tools_installed_in_container = False
+        # Last known "running" state, so execs don't each need a reload() round trip
+        self._container_running = False
+        # Open ShellSession per thread while inside _shell(); execs are routed through it
+        self._shell_local = threading.local()
+        self.skip_cloning = skip_cloning # Assume the repository is already cloned
+        self.tools_installed_in_container = skip_tools_install # Assume the image already has the tools
 
 
-    def _load_config(self) -> dict | None:
-        """Loads and validates the project configuration JSON file."""
+    def _load_config(self, preloaded_config: dict | None = None) -> dict | None:
+        """Loads and validates the project configuration JSON file, unless the caller already parsed it."""
         try:
-            with open(self.project_config_path, 'r') as f:
-                config_data = json.load(f)
+            if preloaded_config is not None:
+                config_data = dict(preloaded_config) # Copy; 'language' is rewritten below
+            else:
+                with open(self.project_config_path, 'rb') as f:
+                    config_data = json_loads(f.read())
             
             if not config_data.get("github_url") or not config_data.get("language"):
-                logger.error(f"Config {self.project_config_path} missing github_url or language.")
+                logger.error("Config %s missing github_url or language.", self.project_config_path)
                 return None
             if config_data["language"].lower() != self.project_lang.lower():
-                logger.warning(f"Language in config ({config_data['language']}) "
-                               f"differs from directory structure ({self.project_lang}). Using directory structure.")
+                logger.warning("Language in config (%s) differs from directory structure (%s). Using directory structure.",
+                               config_data['language'], self.project_lang)
             
             config_data["language"] = self.project_lang
             
             if "atom_operations" not in config_data or not isinstance(config_data["atom_operations"], list):
-                logger.error(f"Config {self.project_config_path} missing 'atom_operations' list.")
+                logger.error("Config %s missing 'atom_operations' list.", self.project_config_path)
+                return None
+
+            # Host commands are parsed once here, with shell quoting rules, rather than
+            # str.split() on every run. Container commands stay strings: they go to sh.
+            try:
+                self.host_pre_clone_commands = [shlex.split(c) for c in config_data.get("host_pre_clone_commands", [])]
+                self.host_post_clone_commands = [shlex.split(c) for c in config_data.get("host_post_clone_commands", [])]
+            except ValueError as e:
+                logger.error("Config %s has a malformed host command: %s", self.project_config_path, e)
                 return None
+            self.container_setup_commands = (config_data.get("install_commands_container", [])
+                                             + config_data.get("build_commands_container", []))
             
             return config_data
         except FileNotFoundError:
-            logger.error(f"Project config file not found: {self.project_config_path}")
+            logger.error("Project config file not found: %s", self.project_config_path)
             return None
         except json.JSONDecodeError:
-            logger.error(f"Error decoding JSON from {self.project_config_path}")
+            logger.error("Error decoding JSON from %s", self.project_config_path)
             return None
 
     def _run_host_command(self, command_parts: list[str], cwd: pathlib.Path | str | None = None, shell=False) -> bool:
         """Runs a command on the host system."""
-        logger.info(f"Host CMD (cwd: {cwd}): {' '.join(command_parts)}")
+        # Arguments are only formatted if the record is emitted; the list is joined lazily too
+        logger.info("Host CMD (cwd: %s): %s", cwd, _JoinedArgs(command_parts))
         try:
             process = subprocess.run(command_parts, capture_output=True, text=True, check=False, cwd=cwd, shell=shell)
             if process.returncode != 0:
-                logger.error(f"Host command failed (ret: {process.returncode}): {' '.join(command_parts)}")
-                logger.error(f"Stdout: {process.stdout}")
-                logger.error(f"Stderr: {process.stderr}")
+                logger.error("Host command failed (ret: %s): %s", process.returncode, _JoinedArgs(command_parts))
+                logger.error("Stdout: %s", process.stdout)
+                logger.error("Stderr: %s", process.stderr)
                 return False
-            logger.info(f"Host command success. Stdout: {process.stdout[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Host command success. Stdout: %s...", process.stdout[:200])
             return True
         except Exception as e:
-            logger.error(f"Exception running host command {' '.join(command_parts)}: {e}")
+            logger.error("Exception running host command %s: %s", _JoinedArgs(command_parts), e)
             return False
 
+    def _build_clone_command(self) -> list[str]:
+        """
+        Builds the git clone command line. Clones are shallow unless the config sets
+        "full_history" (e.g. when tags are needed), in which case history is kept but
+        file contents are fetched lazily. Submodules are fetched in parallel.
+        """
+        jobs = self.config.get("clone_jobs", DEFAULT_CLONE_JOBS)
+        cmd = ["git", "clone", "--recurse-submodules", f"--jobs={jobs}"]
+        if self.config.get("full_history", False):
+            cmd.append("--filter=blob:none")
+        else:
+            cmd.extend(["--depth", str(self.config.get("clone_depth", 1)), "--shallow-submodules"])
+        cmd.extend([self.config["github_url"], str(self.project_clone_path.name)])
+        return cmd
+
+    def _with_submodule_jobs(self, command_parts: list[str]) -> list[str]:
+        """Adds --jobs to a 'git submodule update' command that doesn't already set it."""
+        if command_parts[:2] != ["git", "submodule"] or "update" not in command_parts:
+            return command_parts
+        if any(part == "--jobs" or part.startswith("--jobs=") or part == "-j" for part in command_parts):
+            return command_parts
+        update_index = command_parts.index("update")
+        jobs = self.config.get("clone_jobs", DEFAULT_CLONE_JOBS)
+        return command_parts[:update_index + 1] + [f"--jobs={jobs}"] + command_parts[update_index + 1:]
+
     def _clone_repo(self) -> bool:
         """Clones the project's GitHub repository."""
-        logger.info(f"Cloning {self.config['github_url']} into {self.project_clone_path}...")
+        if self.skip_cloning:
+            return True
+        logger.info("Cloning %s into %s...", self.config['github_url'], self.project_clone_path)
         if self.project_clone_path.exists():
-            logger.info(f"Clone path {self.project_clone_path} already exists. Skipping clone.")    
+            logger.info("Clone path %s already exists. Skipping clone.", self.project_clone_path)
             return True
         
         self.project_clone_path.mkdir(parents=True, exist_ok=True)
         
-        for cmd_str in self.config.get("host_pre_clone_commands", []):
-            if not self._run_host_command(cmd_str.split(), cwd=self.project_clone_path.parent): return False
+        for cmd_parts in self.host_pre_clone_commands:
+            if not self._run_host_command(cmd_parts, cwd=self.project_clone_path.parent): return False
 
-        if not self._run_host_command(["git", "clone", self.config["github_url"], str(self.project_clone_path.name)], cwd=self.project_clone_path.parent):
+        if not self._run_host_command(self._build_clone_command(), cwd=self.project_clone_path.parent):
             return False
         
-        for cmd_str in self.config.get("host_post_clone_commands", []):
-            if not self._run_host_command(cmd_str.split(), cwd=self.project_clone_path): return False
+        for cmd_parts in self.host_post_clone_commands:
+            if not self._run_host_command(self._with_submodule_jobs(cmd_parts), cwd=self.project_clone_path): return False
             
         return True
 
     def _start_container(self) -> bool:
         """Starts a Docker container for processing."""
-        if not self.project_clone_path.exists() or not any(self.project_clone_path.iterdir()):
-             logger.error(f"Project source directory {self.project_clone_path} is empty or does not exist. Cannot start container.")
+        # One opendir answers both "exists" and "non-empty", without a separate stat
+        try:
+            with os.scandir(self.project_clone_path) as it:
+                has_source = next(it, None) is not None
+        except OSError:
+            has_source = False
+        if not has_source:
+             logger.error("Project source directory %s is empty or does not exist. Cannot start container.", self.project_clone_path)
              return False
 
-        logger.info(f"Starting Docker container '{self.container_name}' from image '{ATOM_DOCKER_IMAGE}'...")
+        pooled = self.container_pool.acquire(self.container_image) if self.container_pool is not None else None
+        if pooled is not None:
+            self.container = pooled
+            self._container_running = True
+            return True
+
+        logger.info("Starting Docker container '%s' from image '%s'...", self.container_name, self.container_image)
         try:
-            try:
-                self.docker_client.images.get(ATOM_DOCKER_IMAGE)
-                logger.info(f"Image {ATOM_DOCKER_IMAGE} found locally.")
-            except docker.errors.ImageNotFound:
-                logger.info(f"Image {ATOM_DOCKER_IMAGE} not found locally. Pulling...")
-                self.docker_client.images.pull(ATOM_DOCKER_IMAGE)
-                logger.info(f"Image {ATOM_DOCKER_IMAGE} pulled successfully.")
-
-            self.container = self.docker_client.containers.run(
-                ATOM_DOCKER_IMAGE,
-                name=self.container_name,
-                volumes={str(self.project_clone_path.resolve()): {'bind': '/app', 'mode': 'rw'}},
-                working_dir='/app',
-                command="sleep infinity",
-                detach=True,
-                auto_remove=False
-            )
-
-            time.sleep(5) 
-            logger.info(f"Container '{self.container_name}' started with ID: {self.container.id}")
+            self.container = start_idle_container(self.docker_client, self.container_image, self.container_name,
+                                                  self.base_workspace_dir, output_dir=self.base_output_dir,
+                                                  working_dir=self.container_source_path)
+
+            if not self._wait_ready():
+                return False
+            logger.info("Container '%s' started with ID: %s", self.container_name, self.container.id)
             return True
         except docker.errors.APIError as e:
-            logger.error(f"Docker API error starting container: {e}")
-            if "409" in str(e) and "Conflict" in str(e): 
-                logger.warning(f"Container {self.container_name} already exists. Attempting to use it.")
-                try:
-                    self.container = self.docker_client.containers.get(self.container_name)
-                    if self.container.status != "running":
-                        self.container.start()
-                        time.sleep(5)
-                    logger.info(f"Reattached to existing container {self.container_name}")
-                    return True
-                except docker.errors.NotFound:
-                    logger.error(f"Could not reattach to container {self.container_name} after conflict.")
-                    return False
+            logger.error("Docker API error starting container: %s", e)
             return False
 
-    def _exec_in_container(self, command: str | list[str], workdir: str = "/app", user: str = "", environment: dict = None) -> tuple[int, str, str]:
+    def _ensure_container_running(self) -> bool:
+        """Refreshes the container state and (re)starts it if it has stopped."""
+        self.container.reload()
+        if self.container.status != "running":
+            logger.warning("Container %s was not running. Attempting to start.", self.container.name)
+            self.container.start()
+            if not self._wait_ready():
+                logger.error("Failed to restart container %s. Cannot exec.", self.container.name)
+                return False
+        self._container_running = True
+        return True
+
+    def _wait_ready(self, timeout: float = CONTAINER_READY_TIMEOUT) -> bool:
+        """
+        Polls until the container accepts execs, using a no-op exec as the readiness
+        probe. Checks every 100ms for the first second, then every 500ms.
+        """
+        started = time.monotonic()
+        while True:
+            try:
+                if self.container.exec_run(["true"]).exit_code == 0:
+                    self._container_running = True
+                    return True
+            except docker.errors.APIError:
+                pass # Not accepting execs yet
+            elapsed = time.monotonic() - started
+            if elapsed >= timeout:
+                logger.error("Container %s not ready after %.0fs.", self.container.name, timeout)
+                return False
+            time.sleep(0.1 if elapsed < 1.0 else 0.5)
+
+    def _exec_in_container(self, command: str | list[str], workdir: str | None = None, user: str = "", environment: dict = None) -> tuple[int, str, str]:
         """Executes a command inside the running Docker container."""
         if not self.container:
             logger.error("Container not started. Cannot execute command.")
             return -1, "", "Container not started"
 
+        workdir = workdir or self.container_source_path
+
         if isinstance(command, list):
-            command_str = " ".join(command) 
+            command_str = _JoinedArgs(command)
             cmd_to_exec = command
         else: 
             command_str = command
             cmd_to_exec = ["sh", "-c", command]
 
-        logger.info(f"Container EXEC (workdir: {workdir}, user: {user}): {command_str}")
-        
+        logger.info("Container EXEC (workdir: %s, user: %s): %s", workdir, user, command_str)
+
+        # Inside _shell() plain commands go through the open session; a different
+        # user or environment still needs its own exec
+        session = getattr(self._shell_local, "session", None)
+        if session is not None and not user and not environment:
+            try:
+                exit_code, stdout, stderr = session.run(
+                    shlex.join(command) if isinstance(command, list) else command, workdir=workdir)
+                self._log_exec_result(exit_code, command_str, stdout, stderr)
+                return exit_code, stdout, stderr
+            except ShellSessionLost as e:
+                # The command may have run, or still be running; running it again could
+                # repeat non-idempotent work (atom ops, installs, rm/mv), so fail it instead
+                logger.error("Shell session broke while running %s: %s", command_str, e)
+                session.close()
+                self._shell_local.session = None
+                return -1, "", str(e)
+            except OSError as e:
+                # Nothing reached the shell, so a separate exec is safe
+                logger.warning("Shell session failed (%s); falling back to a separate exec.", e)
+                session.close()
+                self._shell_local.session = None
+
         try:
-            self.container.reload()
-            if self.container.status != "running":
-                logger.warning(f"Container {self.container_name} was not running. Attempting to start.")
-                self.container.start()
-                time.sleep(3)
-                self.container.reload()
-                if self.container.status != "running":
-                    logger.error(f"Failed to restart container {self.container_name}. Cannot exec.")
+            # The cached state is trusted; it is only re-checked when an exec says the
+            # container has stopped, and then the exec is retried once
+            for attempt in range(2):
+                if not self._container_running and not self._ensure_container_running():
                     return -1, "", "Container not running"
-
-            exec_results = self.container.exec_run(
-                cmd_to_exec,
-                workdir=workdir,
-                user=user,
-                environment=environment or {}
-            )
+                try:
+                    exec_results = self.container.exec_run(
+                        cmd_to_exec,
+                        workdir=workdir,
+                        user=user,
+                        environment=environment or {}
+                    )
+                    break
+                except docker.errors.APIError as e:
+                    if attempt or "is not running" not in str(e):
+                        raise
+                    self._container_running = False
             stdout_bytes = exec_results.output
             stderr_bytes = exec_results.output
             exit_code = exec_results.exit_code
             stdout = stdout_bytes.decode('utf-8', errors='replace') if stdout_bytes else ""
             stderr = stderr_bytes.decode('utf-8', errors='replace') if stderr_bytes else ""
 
-            if exit_code != 0:
-                logger.warning(f"Container command failed (ret: {exit_code}): {command_str}")
-                logger.warning(f"Stdout: {stdout}")
-                logger.warning(f"Stderr: {stderr}")
-            else:
-                logger.info(f"Container command success. Stdout: {stdout[:200]}...")
+            self._log_exec_result(exit_code, command_str, stdout, stderr)
             return exit_code, stdout, stderr
         except docker.errors.APIError as e:
-            logger.error(f"Docker API error during exec: {e}")
+            logger.error("Docker API error during exec: %s", e)
             return -1, "", str(e)
 
+    @staticmethod
+    def _log_exec_result(exit_code: int, command_str, stdout: str, stderr: str):
+        """Logs a failed exec in full; successful ones only at DEBUG."""
+        if exit_code != 0:
+            logger.warning("Container command failed (ret: %s): %s", exit_code, command_str)
+            logger.warning("Stdout: %s", stdout)
+            logger.warning("Stderr: %s", stderr)
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Container command success. Stdout: %s...", stdout[:200])
+
+    @contextlib.contextmanager
+    def _shell(self):
+        """
+        Routes this thread's _exec_in_container calls through one persistent shell
+        session for the duration of the block. Nested uses share the outer session.
+        """
+        if getattr(self._shell_local, "session", None) is not None:
+            yield
+            return
+        session = None
+        if self._container_running or self._ensure_container_running():
+            try:
+                session = ShellSession(self.docker_client.api, self.container.id).__enter__()
+            except (OSError, docker.errors.APIError) as e:
+                logger.warning("Could not open a shell session, using one exec per command: %s", e)
+        self._shell_local.session = session
+        try:
+            yield
+        finally:
+            self._shell_local.session = None
+            if session is not None:
+                session.close()
+
+    def _exec_script(self, commands: list[str], workdir: str | None = None) -> tuple[int, str, str]:
+        """
+        Runs a list of shell commands as one script in a single exec, stopping at the
+        first failure. Traces each command (set -x) when DEBUG logging is on.
+        """
+        prologue = "set -ex" if logger.isEnabledFor(logging.DEBUG) else "set -e"
+        return self._exec_in_container("\n".join([prologue, *commands]), workdir=workdir)
+
     def _install_atom_tools_in_container(self) -> bool:
         """Installs atom (npm), native image, cdxgen, and parsetools in the container."""
         if self.tools_installed_in_container:
             logger.info("Tools already reported as installed in this container session.")
             return True
 
+        image_id = self.container.attrs.get("Image")
+        with _tools_present_lock:
+            known_present = self.container.id in _tools_present_ids or image_id in _tools_present_ids
+        if known_present:
+            logger.info("Atom tools known to be present in this container or its image. Skipping install.")
+            self.tools_installed_in_container = True
+            return True
+
+        # Pooled containers may already have been prepared by an earlier project
+        exit_code, _, _ = self._exec_in_container(
+            f"command -v atom && command -v cdxgen && command -v {ATOM_NATIVE_EXECUTABLE_NAME}")
+        if exit_code == 0:
+            logger.info("Atom tools already present in container. Skipping install.")
+            self.tools_installed_in_container = True
+            # Only a prepared image is guaranteed to have them in every container
+            from_prepared = (self.container.attrs.get("Config") or {}).get("Image", "").startswith(
+                f"{ATOM_PREPARED_IMAGE_REPOSITORY}:")
+            with _tools_present_lock:
+                _tools_present_ids.add(self.container.id)
+                if from_prepared and image_id:
+                    _tools_present_ids.add(image_id)
+            return True
+
         logger.info("Installing atom tools in container...")
-        
-        # 1. npm packages
-        npm_packages = "@appthreat/atom @cyclonedx/cdxgen --omit=optional @appthreat/atom-parsetools"
-        exit_code, _, _ = self._exec_in_container(f"npm install -g {npm_packages}")
-        if exit_code != 0:
-            logger.error("Failed to install npm packages in container.")
+
+        # Atom native image (Linux amd64 assumed): downloaded once on the host and
+        # dropped straight into /usr/local/bin with a single API call
+        native = fetch_native_image(self.base_workspace_dir)
+        if native is None:
+            logger.error("Atom native image is not available on the host.")
+            return False
+        try:
+            with open(native[0], 'rb') as f:
+                if not self.container.put_archive("/usr/local/bin", f):
+                    raise docker.errors.APIError("put_archive returned False")
+        except (docker.errors.APIError, OSError) as e:
+            logger.error("Failed to copy atom native image into container: %s", e)
             return False
-        logger.info("npm packages installed.")
 
-        # 2. Atom native image (Linux amd64 assumed)
-        # Check if already exists to avoid re-downloading if container is reused somehow
-        exit_code, stdout, _ = self._exec_in_container(f"{ATOM_NATIVE_EXECUTABLE_NAME} --help")
-        if exit_code == 0 and ATOM_NATIVE_EXECUTABLE_NAME in stdout:
-            logger.info(f"Atom native image '{ATOM_NATIVE_EXECUTABLE_NAME}' already found in container's PATH.")
-        else:
-            logger.info(f"Downloading and installing atom native image '{ATOM_NATIVE_IMAGE_NAME_LINUX}'...")
-            native_install_cmds = [
-                f"curl -fsSL -o {ATOM_NATIVE_IMAGE_NAME_LINUX} {ATOM_NATIVE_IMAGE_URL_LINUX}",
-                f"chmod +x {ATOM_NATIVE_IMAGE_NAME_LINUX}",
-                f"mv {ATOM_NATIVE_IMAGE_NAME_LINUX} /usr/local/bin/{ATOM_NATIVE_EXECUTABLE_NAME}",
-                f"{ATOM_NATIVE_EXECUTABLE_NAME} --help" # Test it
-            ]
-            for cmd in native_install_cmds:
-                exit_code, _, _ = self._exec_in_container(cmd)
-                if exit_code != 0:
-                    logger.error(f"Failed to install atom native image (command: {cmd}).")
-                    return False
-            logger.info("Atom native image installed.")
+        # npm packages plus a check of the native binary, in one exec
+        install_cmds = [
+            f"npm install -g {ATOM_NPM_PACKAGES}",
+            f"{ATOM_NATIVE_EXECUTABLE_NAME} --help >/dev/null" # Test it
+        ]
+        exit_code, _, _ = self._exec_script(install_cmds)
+        if exit_code != 0:
+            logger.error("Failed to install atom tools in container.")
+            return False
+        logger.info("Atom tools installed.")
         
         self.tools_installed_in_container = True
+        with _tools_present_lock:
+            _tools_present_ids.add(self.container.id)
+        self._commit_prepared_image(native[1])
         return True
 
+    def _results_cache_key(self) -> str | None:
+        """
+        Key under which this project's atom outputs are cached: the source tree's git
+        tree ID, the project config and the atom tool versions in the container.
+        None when any of them can't be determined, or the checkout has local changes.
+        """
+        try:
+            tree = subprocess.run(["git", "rev-parse", "HEAD^{tree}"], cwd=self.project_clone_path,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+            dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                   cwd=self.project_clone_path, capture_output=True, text=True, check=True).stdout
+        except (subprocess.CalledProcessError, OSError):
+            return None
+        if not tree or dirty:
+            return None
+
+        with _tool_fingerprint_lock:
+            tools = _tool_fingerprints.get(self.container.id)
+        if tools is None:
+            exit_code, stdout, _ = self._exec_in_container(TOOL_FINGERPRINT_SCRIPT)
+            if exit_code != 0:
+                return None
+            tools = hashlib.sha256(stdout.encode()).hexdigest()
+            with _tool_fingerprint_lock:
+                _tool_fingerprints[self.container.id] = tools
+
+        key = hashlib.sha256()
+        for part in (tree, json.dumps(self.config, sort_keys=True), tools):
+            key.update(part.encode())
+            key.update(b"\0")
+        return key.hexdigest()
+
+    def _outputs_fresh(self) -> bool:
+        """
+        Whether the outputs of the last complete run can be used as they are: every
+        expected output file is present, and nothing in the source tree (outside .git),
+        the project config or the host's atom native binary has changed since.
+        """
+        try:
+            stamp_mtime = (self.project_output_path / OUTPUTS_COMPLETE_STAMP).stat().st_mtime_ns
+            newest = max(self.project_config_path.stat().st_mtime_ns, self.project_clone_path.stat().st_mtime_ns)
+        except OSError:
+            return False
+        try:
+            newest = max(newest, (self.base_workspace_dir / ".cache" / ATOM_NATIVE_EXECUTABLE_NAME).stat().st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        if newest >= stamp_mtime:
+            return False
+
+        suffixes = [operation["host_target_file_suffix"] for operation in self.config.get("atom_operations", [])
+                    if operation.get("atom_main_command") and operation.get("host_target_file_suffix")]
+        if not suffixes:
+            return False
+        for output_dir in (self.jar_output_dir, self.native_output_dir):
+            if not all(os.path.isfile(output_dir / suffix) for suffix in suffixes):
+                return False
+
+        # Directory mtimes catch deletions and renames; stops at the first newer entry
+        stack = [os.fspath(self.project_clone_path)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.name == ".git":
+                            continue
+                        if entry.stat(follow_symlinks=False).st_mtime_ns >= stamp_mtime:
+                            return False
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+            except OSError:
+                return False
+        return True
+
+    def _restore_cached_results(self, key: str) -> bool:
+        """Copies cached JAR and native outputs for key into this project's output dirs, if present."""
+        entry = self.base_workspace_dir / ".cache" / "results" / key
+        if not entry.is_dir():
+            return False
+        try:
+            for output_dir in (self.jar_output_dir, self.native_output_dir):
+                shutil.copytree(entry / output_dir.name, output_dir, dirs_exist_ok=True)
+        except OSError as e:
+            logger.warning("Could not restore cached atom results %s: %s", key, e)
+            return False
+        logger.info("Restored atom outputs from cache entry %s.", key)
+        return True
+
+    def _store_cached_results(self, key: str):
+        """Saves this project's JAR and native outputs under key. Entries appear atomically."""
+        results_dir = self.base_workspace_dir / ".cache" / "results"
+        entry = results_dir / key
+        staging = results_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            for output_dir in (self.jar_output_dir, self.native_output_dir):
+                shutil.copytree(output_dir, staging / output_dir.name)
+            os.rename(staging, entry)
+        except OSError as e:
+            # An existing entry means another run stored the same results first
+            if not entry.is_dir():
+                logger.warning("Could not cache atom results %s: %s", key, e)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _commit_prepared_image(self, native_digest: str):
+        """Snapshots this freshly prepared container so later containers start with the tools installed."""
+        prepared = prepared_image_name(self.container.attrs["Image"], native_digest)
+        try:
+            self.docker_client.images.get(prepared)
+            return # Another project got there first
+        except docker.errors.ImageNotFound:
+            pass
+        repository, tag = prepared.split(":", 1)
+        logger.info("Committing prepared image %s...", prepared)
+        try:
+            image = self.container.commit(repository=repository, tag=tag)
+            with _tools_present_lock:
+                _tools_present_ids.add(image.id)
+            logger.info("Prepared image %s committed.", prepared)
+        except docker.errors.APIError as e:
+            # Only a missed optimisation; the project itself can carry on
+            logger.warning("Could not commit prepared image %s: %s", prepared, e)
+
     def _run_project_install_build_in_container(self) -> bool:
         """Runs project-specific installation and build commands inside the container."""
         logger.info("Running project install/build commands in container...")
         project_subdir = self.config.get("project_dir_in_repo", ".")
-        workdir_path = f"/app/{project_subdir}" if project_subdir != "." else "/app"
+        workdir_path = f"{self.container_source_path}/{project_subdir}" if project_subdir != "." else self.container_source_path
 
-        # for cmd_str in self.config.get("install_commands_container", []):
-        #     exit_code, _, _ = self._exec_in_container(cmd_str, workdir=workdir_path)
+        # if self.container_setup_commands:
+        #     exit_code, _, _ = self._exec_script(self.container_setup_commands, workdir=workdir_path)
         #     if exit_code != 0:
-        #         logger.error(f"Project install command failed: {cmd_str}")
-        #         return False
-        
-        # for cmd_str in self.config.get("build_commands_container", []):
-        #     exit_code, _, _ = self._exec_in_container(cmd_str, workdir=workdir_path)
-        #     if exit_code != 0:
-        #         logger.error(f"Project build command failed: {cmd_str}")
+        #         logger.error("Project install/build commands failed.")
         #         return False
         
         logger.info("Project install/build commands completed.")
         return True
 
-    def _run_atom_operations(self, atom_executable: str, output_subdir: pathlib.Path) -> bool:
-        """Runs the configured atom operations using the specified atom executable."""
-        logger.info(f"Running atom operations using '{atom_executable}' for output to '{output_subdir}'...")
+    def _container_output_path(self, host_dir: pathlib.Path) -> str | None:
+        """
+        Where a host directory under the output dir appears inside the container, or None
+        if this container has no output mount (e.g. one started without an output_dir).
+        """
+        mounts = self.container.attrs.get("Mounts") or []
+        if not any(m.get("Destination") == CONTAINER_OUTPUT_MOUNT for m in mounts):
+            return None
+        host, base = _resolved_host_path(host_dir), _resolved_host_path(self.base_output_dir)
+        if host == base:
+            return CONTAINER_OUTPUT_MOUNT
+        if not host.startswith(base + os.sep):
+            return None
+        return f"{CONTAINER_OUTPUT_MOUNT}/{host[len(base) + 1:].replace(os.sep, '/')}"
+
+    def _generate_sbom_if_needed(self):
+        """Generates the SBOM that reachables analysis reads, once for both atom executables."""
+        has_reachables = any(op.get("atom_main_command") == "reachables" for op in self.config.get("atom_operations", []))
+        if not has_reachables:
+            return
+        logger.info("Reachables operation detected, ensuring SBOM generation with cdxgen...")
+
+        project_source_container_path = self.config.get("project_dir_in_repo", ".")
+        cdxgen_cmd = f"cdxgen -o bom.json --project-path ." 
+        exit_code, _, _ = self._exec_in_container(cdxgen_cmd, workdir=f"{self.container_source_path}/{project_source_container_path}")
+        if exit_code != 0:
+            logger.warning("cdxgen command failed. Reachables analysis might be affected.")
+        else:
+            logger.info("cdxgen SBOM generation successful (or attempted).")
+
+    def _run_atom_operations(self, atom_executable: str, output_subdir: pathlib.Path,
+                             scratch_dir: str | None = None, on_operation_done=None) -> AtomRunResult:
+        """
+        Runs the configured atom operations using the specified atom executable.
+        With a scratch_dir, outputs that aren't going to the host (including atom's
+        default app.atom) are written under it instead of into the source tree.
+        on_operation_done, if given, is called with an operation's index in the config
+        once it has succeeded and its outputs are on the host.
+        """
+        # JAR and native runs log side by side; tag every line with the run it belongs to
+        tag = "[native]" if atom_executable == ATOM_NATIVE_EXECUTABLE_NAME else "[jar]"
+        logger.info("%s Running atom operations using '%s' for output to '%s'...", tag, atom_executable, output_subdir)
         output_subdir.mkdir(parents=True, exist_ok=True)
         
         project_lang = self.config["language"]
         project_source_container_path = self.config.get("project_dir_in_repo", ".")
-        
-        has_reachables = any(op.get("atom_main_command") == "reachables" for op in self.config.get("atom_operations", []))
-        if has_reachables:
-            logger.info("Reachables operation detected, ensuring SBOM generation with cdxgen...")
+        workdir = f"{self.container_source_path}/{project_source_container_path}"
+        # Outputs wanted on the host are written straight into the bind-mounted output
+        # dir; only containers without that mount fall back to copying them out
+        container_output_dir = self._container_output_path(output_subdir)
 
-            cdxgen_cmd = f"cdxgen -o bom.json --project-path ." 
-            exit_code, _, _ = self._exec_in_container(cdxgen_cmd, workdir=f"/app/{project_source_container_path}")
+        if scratch_dir:
+            exit_code, _, _ = self._exec_in_container(["sh", "-c", 'rm -rf "$1" && mkdir -p "$1"', "sh", scratch_dir])
             if exit_code != 0:
-                logger.warning(f"cdxgen command failed. Reachables analysis might be affected.")
-            else:
-                logger.info("cdxgen SBOM generation successful (or attempted).")
-
+                return AtomRunResult(ok=False, succeeded=0)
 
-        for operation in self.config.get("atom_operations", []):
+        # (op_name, atom command parts, [(container_src, host_dest), ...], config index) per operation
+        planned_ops = []
+        for index, operation in enumerate(self.config.get("atom_operations", [])):
             op_name = operation.get("name", "unnamed_operation")
             main_cmd = operation.get("atom_main_command")
             if not main_cmd:
-                logger.warning(f"Skipping operation '{op_name}' due to missing 'atom_main_command'.")
+                logger.warning("%s Skipping operation '%s' due to missing 'atom_main_command'.", tag, op_name)
                 continue
 
-            logger.info(f"Executing atom operation: '{op_name}' ({main_cmd})")
-
             # Construct atom command
             # Atom CLI: atom [parsedeps|data-flow|usages|reachables] [options] [input]
-            # Input is the project directory relative to /app
+            # Input is the project directory relative to the container source path
             atom_cmd_parts = [atom_executable, main_cmd]
 
 
             primary_out_container = operation.get("atom_primary_output_container")
             slice_out_container = operation.get("atom_slice_output_container")
+            copy_primary = bool(primary_out_container and operation.get("copy_primary_output", False)) # Add a flag if needed
+            copy_slice = bool(slice_out_container and operation.get("host_target_file_suffix"))
             
             if primary_out_container:
+                if copy_primary and container_output_dir:
+                    primary_out_container = f"{container_output_dir}/{os.path.basename(primary_out_container)}"
+                    copy_primary = False
+                elif scratch_dir and not primary_out_container.startswith("/"):
+                    primary_out_container = f"{scratch_dir}/{primary_out_container}"
                 atom_cmd_parts.extend(["-o", primary_out_container])
+            elif scratch_dir:
+                atom_cmd_parts.extend(["-o", f"{scratch_dir}/app.atom"])
             if slice_out_container:
+                if copy_slice and container_output_dir:
+                    (output_subdir / operation["host_target_file_suffix"]).parent.mkdir(parents=True, exist_ok=True)
+                    slice_out_container = f"{container_output_dir}/{operation['host_target_file_suffix']}"
+                    copy_slice = False
+                elif scratch_dir and not slice_out_container.startswith("/"):
+                    slice_out_container = f"{scratch_dir}/{slice_out_container}"
                 atom_cmd_parts.extend(["-s", slice_out_container])
 
             atom_cmd_parts.extend(["-l", project_lang])
@@ -323,26 +1199,86 @@ class ProjectProcessor:
 
             atom_cmd_parts.append(".")
 
-            exit_code, stdout, stderr = self._exec_in_container(
-                atom_cmd_parts,
-                workdir=f"/app/{project_source_container_path}"
-            )
-
+            files_to_copy = []
+            if copy_primary:
+                 files_to_copy.append((posixpath.join(workdir, primary_out_container),
+                                       output_subdir / os.path.basename(primary_out_container)))
+            if copy_slice:
+                 files_to_copy.append((posixpath.join(workdir, slice_out_container),
+                                       output_subdir / operation["host_target_file_suffix"]))
+            planned_ops.append((op_name, atom_cmd_parts, files_to_copy, index))
+
+        def finish(planned_op, exit_code: int):
+            op_name, _, files_to_copy, index = planned_op
             if exit_code != 0:
-                logger.error(f"Atom operation '{op_name}' using '{atom_executable}' failed.")
-            else:
-                logger.info(f"Atom operation '{op_name}' using '{atom_executable}' successful.")
-                files_to_copy = []
-                if primary_out_container and operation.get("copy_primary_output", False): # Add a flag if needed
-                     files_to_copy.append((f"/app/{project_source_container_path}/{primary_out_container}", 
-                                           output_subdir / os.path.basename(primary_out_container)))
-                if slice_out_container and operation.get("host_target_file_suffix"):
-                     files_to_copy.append((f"/app/{project_source_container_path}/{slice_out_container}",
-                                           output_subdir / operation["host_target_file_suffix"]))
-                
-                for container_src, host_dest in files_to_copy:
-                    self._copy_from_container(container_src, host_dest)
-        return True
+                logger.error("%s Atom operation '%s' using '%s' failed.", tag, op_name, atom_executable)
+                return
+            logger.info("%s Atom operation '%s' using '%s' successful.", tag, op_name, atom_executable)
+            for container_src, host_dest in files_to_copy:
+                self._copy_from_container(container_src, host_dest)
+            if on_operation_done is not None:
+                on_operation_done(index)
+
+        if self._can_run_atom_ops_in_parallel(atom_executable, planned_ops):
+            exit_codes = self._exec_atom_ops_batch([planned_op[1] for planned_op in planned_ops], workdir, tag)
+            for planned_op, exit_code in zip(planned_ops, exit_codes):
+                finish(planned_op, exit_code)
+        else:
+            # Each operation is finished before the next starts, so its outputs can be
+            # diffed while the rest still run
+            exit_codes = []
+            for planned_op in planned_ops:
+                logger.info("%s Executing atom operation: '%s' (%s)", tag, planned_op[0], planned_op[1][1])
+                exit_code, _, _ = self._exec_in_container(planned_op[1], workdir=workdir)
+                finish(planned_op, exit_code)
+                exit_codes.append(exit_code)
+        succeeded = sum(1 for exit_code in exit_codes if exit_code == 0)
+        return AtomRunResult(ok=succeeded == len(exit_codes), succeeded=succeeded)
+
+    def _run_atom_operations_in_thread(self, atom_executable: str, output_subdir: pathlib.Path, scratch_dir: str,
+                                       on_operation_done=None) -> AtomRunResult:
+        """
+        _run_atom_operations inside a shell session for the calling thread: a worker
+        thread opens its own, a thread already inside _shell() shares its session.
+        """
+        with self._shell():
+            return self._run_atom_operations(atom_executable, output_subdir, scratch_dir=scratch_dir,
+                                             on_operation_done=on_operation_done)
+
+    def _can_run_atom_ops_in_parallel(self, atom_executable: str, planned_ops: list) -> bool:
+        """
+        Whether a project's atom operations may run concurrently. Only the native binary
+        is run this way (several JVMs at once tend to exhaust memory), and only when every
+        operation names its own output files; otherwise they would all write app.atom.
+        """
+        if atom_executable != ATOM_NATIVE_EXECUTABLE_NAME or len(planned_ops) < 2:
+            return False
+        if not self.config.get("atom_parallel", True) or self.config.get("max_parallel_ops", DEFAULT_MAX_PARALLEL_ATOM_OPS) < 2:
+            return False
+        outputs = []
+        for _, parts, _, _ in planned_ops:
+            if "-o" not in parts:
+                return False
+            outputs.extend(parts[i + 1] for i, part in enumerate(parts) if part in ("-o", "-s"))
+        return len(outputs) == len(set(outputs))
+
+    def _exec_atom_ops_batch(self, commands: list[list[str]], workdir: str, tag: str) -> list[int]:
+        """
+        Runs atom commands as one script in a single exec, max_parallel_ops at a time,
+        and returns each command's exit code. A failed command doesn't stop the others.
+        """
+        max_parallel = self.config.get("max_parallel_ops", DEFAULT_MAX_PARALLEL_ATOM_OPS)
+        lines = []
+        for start in range(0, len(commands), max_parallel):
+            group = range(start, min(start + max_parallel, len(commands)))
+            lines.append(" ".join(f"{{ {shlex.join(commands[i])}; echo __ATOM_OP_{i}__ $?; }} &" for i in group) + " wait")
+        logger.info("%s Executing %d atom operations, up to %d at a time", tag, len(commands), max_parallel)
+
+        _, stdout, _ = self._exec_in_container("\n".join(lines), workdir=workdir)
+        exit_codes = [-1] * len(commands) # An op with no status line never finished
+        for match in re.finditer(r"__ATOM_OP_(\d+)__ (\d+)", stdout):
+            exit_codes[int(match.group(1))] = int(match.group(2))
+        return exit_codes
 
     def _copy_from_container(self, container_path: str, host_path: pathlib.Path) -> bool:
         """Copies a file or directory from the container to the host."""
@@ -350,21 +1286,12 @@ class ProjectProcessor:
             logger.error("Container not available for copying.")
             return False
         
-        logger.info(f"Copying from container '{container_path}' to host '{host_path}'...")
+        logger.info("Copying from container '%s' to host '%s'...", container_path, host_path)
         host_path.parent.mkdir(parents=True, exist_ok=True)
         
         try:
-            exit_code, stdout, _ = self._exec_in_container(['test', '-e', container_path])
-            if exit_code != 0:
-                logger.warning(f"Path '{container_path}' does not exist in container. Cannot copy.")
-                return False
-
-            bits, stat = self.container.get_archive(container_path)
-            
-            temp_tar_path = self.base_workspace_dir / f"temp_{self.container_name}_{os.path.basename(container_path)}.tar"
-            with open(temp_tar_path, 'wb') as f:
-                for chunk in bits:
-                    f.write(chunk)
+            # A missing path surfaces as NotFound here, so no separate existence check
+            bits, _ = self.container.get_archive(container_path)
             
             if not host_path.suffix: 
                  host_path.mkdir(parents=True, exist_ok=True)
@@ -373,127 +1300,334 @@ class ProjectProcessor:
                  host_path.parent.mkdir(parents=True, exist_ok=True)
                  extract_to_dir = host_path.parent
 
-            import tarfile
-            with tarfile.open(temp_tar_path, 'r') as tar:
-                members = tar.getmembers()
-                if len(members) == 1 and members[0].isdir():
-                    for member in members:
-                        original_name = member.name
-                        member.name = os.path.relpath(member.name, members[0].name)
-                        if member.name == ".": continue 
-                        tar.extract(member, path=extract_to_dir)
-
-                    tar.extractall(path=extract_to_dir)
-                    extracted_file_name = os.path.basename(container_path)
-                    if (extract_to_dir / extracted_file_name).exists() and str(host_path.name) != extracted_file_name:
-                        shutil.move(str(extract_to_dir / extracted_file_name), str(host_path))
-                    elif not (extract_to_dir / host_path.name).exists() and (extract_to_dir / extracted_file_name).is_file():
-                         if host_path.parent == extract_to_dir and host_path.name != extracted_file_name:
-                            os.rename(extract_to_dir / extracted_file_name, host_path)
-
-
-                else:
-                    tar.extractall(path=extract_to_dir)
-
-            temp_tar_path.unlink()
-            logger.info(f"Successfully copied to {host_path}")
+            # Extract straight off the API stream: 'r|' reads the archive sequentially,
+            # so there is no temp tarball and no up-front member index. The archive's
+            # top-level entry is named after the container path. Members are written out
+            # in ARCHIVE_STREAM_BUFFER_SIZE chunks rather than tarfile's default 16 KiB.
+            top = posixpath.basename(container_path.rstrip("/"))
+            stream = io.BufferedReader(_ChunkReader(bits), buffer_size=ARCHIVE_STREAM_BUFFER_SIZE)
+            with tarfile.open(fileobj=stream, mode="r|", copybufsize=ARCHIVE_STREAM_BUFFER_SIZE) as tar:
+                for member in tar:
+                    if member.name == top:
+                        if member.isdir():
+                            continue # Directory copy: its contents go straight into host_path
+                        if host_path.suffix:
+                            # Single-file copy: write it under the requested host name directly
+                            member.name = host_path.name
+                    else:
+                        member.name = posixpath.relpath(member.name, top)
+                    tar.extract(member, path=extract_to_dir)
+
+            logger.info("Successfully copied to %s", host_path)
             return True
 
         except docker.errors.NotFound:
-            logger.warning(f"Path '{container_path}' not found in container for copying.")
+            logger.warning("Path '%s' not found in container for copying.", container_path)
             return False
         except Exception as e:
-            logger.error(f"Error copying from container: {e}")
-            if 'temp_tar_path' in locals() and temp_tar_path.exists():
-                temp_tar_path.unlink()
+            logger.error("Error copying from container: %s", e)
             return False
 
-    def _compare_outputs(self) -> bool:
-        """Compares JSON outputs from JAR and Native runs using custom-json-diff."""
+    def _diff_tool_available(self) -> bool:
+        """
+        Checks if custom-json-diff (cjd) is available. When it is importable the diffs
+        run in-process, saving an interpreter start and import per diff.
+        """
+        if custom_diff is None:
+            try:
+                subprocess.run(["cjd", "--version"], capture_output=True, check=True)
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                logger.error("`custom-json-diff` (cjd) command not found or not executable.")
+                logger.error("Please install it: `pip install custom-json-diff` and ensure it's in your PATH.")
+                return False
+        return True
+
+    def _compare_outputs(self, already_compared: set[int] = frozenset()) -> bool:
+        """
+        Compares JSON outputs from JAR and Native runs using custom-json-diff. Operations
+        whose index is in already_compared were diffed while the atom runs went on.
+        """
         logger.info("Comparing JAR and Native outputs...")
-        self.diff_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Check if custom-json-diff (cjd) is available
-        try:
-            subprocess.run(["cjd", "--version"], capture_output=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            logger.error("`custom-json-diff` (cjd) command not found or not executable.")
-            logger.error("Please install it: `pip install custom-json-diff` and ensure it's in your PATH.")
+        if not self._diff_tool_available():
             return False
 
-        for operation in self.config.get("atom_operations", []):
-            if not operation.get("is_json_diff_target", False):
-                continue
-            
-            op_name = operation.get("name", "unnamed_operation")
+        pending = [operation for index, operation in enumerate(self.config.get("atom_operations", []))
+                   if index not in already_compared and operation.get("is_json_diff_target", False)]
+        self._prefetch_diff_inputs(pending)
+        # Each thread only waits on its diff's worker process or cjd subprocess
+        with ThreadPoolExecutor(max_workers=max(1, min(DIFF_WORKERS, len(pending)))) as executor:
+            list(executor.map(self._compare_operation, pending))
+        return True
+
+    def _prefetch_diff_inputs(self, operations: list[dict]):
+        """
+        Asks the kernel to start reading every JAR and native file the operations will
+        diff, so the reads overlap with the diffs ahead of them instead of each diff
+        waiting on its own. Linux only; purely advisory.
+        """
+        if not hasattr(os, "posix_fadvise"):
+            return
+        for operation in operations:
             file_suffix = operation.get("host_target_file_suffix")
             if not file_suffix:
-                logger.warning(f"Skipping diff for '{op_name}': missing 'host_target_file_suffix'.")
-                continue
-
-            jar_file = self.jar_output_dir / file_suffix
-            native_file = self.native_output_dir / file_suffix
-            diff_output_file = self.diff_dir / f"{file_suffix}.diff.json"
-            # Report output can also be configured, e.g. to .html or .txt
-            # diff_report_file = self.diff_dir / f"{file_suffix}.diff.html" 
-
-            if not jar_file.exists():
-                logger.warning(f"JAR output file for diff not found: {jar_file}")
-                continue
-            if not native_file.exists():
-                logger.warning(f"Native output file for diff not found: {native_file}")
                 continue
+            for output_dir in (self.jar_output_dir, self.native_output_dir):
+                try:
+                    fd = os.open(output_dir / file_suffix, os.O_RDONLY)
+                except OSError:
+                    continue # Reported by the diff itself
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                except OSError:
+                    pass
+                finally:
+                    os.close(fd)
+
+    def _compare_as_ready(self, ready: queue.SimpleQueue, compared: set[int]):
+        """
+        Diffs operations (by index) as soon as both their JAR and native outputs have
+        landed, until None is received. Indices it diffed are added to compared; one
+        whose diff raised is logged and left for step 7 to retry.
+        """
+        available = None
+        while (index := ready.get()) is not None:
+            if available is None:
+                available = self._diff_tool_available()
+            if available:
+                try:
+                    self._compare_operation(self.config["atom_operations"][index])
+                except Exception as e:
+                    logger.error("Diff of operation %s failed while the atom runs went on: %s", index, e,
+                                 exc_info=True)
+                    continue
+                compared.add(index)
+
+    def _compare_operation(self, operation: dict):
+        """Diffs one operation's JAR and native output files, if it is a diff target."""
+        if not operation.get("is_json_diff_target", False):
+            return
+
+        op_name = operation.get("name", "unnamed_operation")
+        file_suffix = operation.get("host_target_file_suffix")
+        if not file_suffix:
+            logger.warning("Skipping diff for '%s': missing 'host_target_file_suffix'.", op_name)
+            return
+
+        jar_file = self.jar_output_dir / file_suffix
+        native_file = self.native_output_dir / file_suffix
+        diff_output_file = self.diff_dir / f"{file_suffix}.diff.json"
+        # Report output can also be configured, e.g. to .html or .txt
+        # diff_report_file = self.diff_dir / f"{file_suffix}.diff.html" 
+
+        if not jar_file.exists():
+            logger.warning("JAR output file for diff not found: %s", jar_file)
+            self._record_diff(file_suffix, "missing_input")
+            return
+        if not native_file.exists():
+            logger.warning("Native output file for diff not found: %s", native_file)
+            self._record_diff(file_suffix, "missing_input")
+            return
+
+        # custom-json-diff -i <older> <newer> -o <diff_json> preset-diff --type <type>
+        # Assuming JAR is "older" for consistency, though order might not matter for diff content
+        # The preset type might need to be configurable. Defaulting to 'bom' as per example.
+        cjd_preset_type = operation.get("cjd_preset_type", "bom")
+
+        # atom is deterministic, so unchanged inputs (same size and mtime, e.g. restored
+        # from the results cache or an identical re-run) mean the last diff still holds
+        jar_st, native_st = jar_file.stat(), native_file.stat()
+        signature = (f"{jar_st.st_size}:{jar_st.st_mtime_ns} {native_st.st_size}:{native_st.st_mtime_ns} "
+                     f"{cjd_preset_type}")
+        signature_file = diff_output_file.with_name(f"{diff_output_file.name}.inputs")
+        # Suffixes may be nested (e.g. "sub/other.json")
+        diff_output_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if diff_output_file.exists() and signature_file.read_text() == signature:
+                logger.info("Diff for %s is up to date at %s", file_suffix, diff_output_file)
+                self._record_diff(file_suffix, "up_to_date", diff_output_file)
+                return
+        except FileNotFoundError:
+            pass
 
-            logger.info(f"Comparing '{jar_file.name}' (JAR) vs '{native_file.name}' (Native)...")
-            
-            # custom-json-diff -i <older> <newer> -o <diff_json> preset-diff --type <type>
-            # Assuming JAR is "older" for consistency, though order might not matter for diff content
-            # The preset type might need to be configurable. Defaulting to 'bom' as per example.
-            cjd_preset_type = operation.get("cjd_preset_type", "bom")
-            
-            cmd = [
-                "cjd",
-                "-i", str(jar_file), str(native_file),
-                "-o", str(diff_output_file),
-                "preset-diff", "--type", cjd_preset_type
-            ]
-            # Add other cjd options from config if needed, e.g., --allow-new-versions
-            # for opt_key, opt_val in operation.get("cjd_options", {}).items():
-            #    cmd.append(opt_key)
-            #    if opt_val is not True: # if it's a flag like --allow-new-versions
-            #        cmd.append(str(opt_val))
-
-
-            if not self._run_host_command(cmd, cwd=self.project_output_path):
-                logger.error(f"custom-json-diff failed for {file_suffix}")
-            else:
-                logger.info(f"Diff for {file_suffix} created at {diff_output_file}")
+        logger.info("Comparing '%s' (JAR) vs '%s' (Native)...", jar_file.name, native_file.name)
         
-        return True
+        cmd = [
+            "cjd",
+            "-i", str(jar_file), str(native_file),
+            "-o", str(diff_output_file),
+            "preset-diff", "--type", cjd_preset_type
+        ]
+        # Add other cjd options from config if needed, e.g., --allow-new-versions
+        # for opt_key, opt_val in operation.get("cjd_options", {}).items():
+        #    cmd.append(opt_key)
+        #    if opt_val is not True: # if it's a flag like --allow-new-versions
+        #        cmd.append(str(opt_val))
+
+
+        if custom_diff is not None:
+            try:
+                error = _run_in_diff_worker(self._run_cjd_in_process, jar_file, native_file,
+                                            diff_output_file, cjd_preset_type)
+            except BrokenProcessPool as e:
+                error = f"diff worker process died: {e}"
+            if error:
+                logger.error("custom-json-diff raised an error: %s", error)
+            ok = error is None
+        else:
+            ok = self._run_host_command(cmd, cwd=self.project_output_path)
+        if not ok:
+            logger.error("custom-json-diff failed for %s", file_suffix)
+            signature_file.unlink(missing_ok=True)
+            self._record_diff(file_suffix, "failed")
+        else:
+            logger.info("Diff for %s created at %s", file_suffix, diff_output_file)
+            try:
+                signature_file.write_text(signature)
+            except OSError as e:
+                # The diff stands; it just gets recomputed next time
+                logger.warning("Could not record the inputs of the diff for %s: %s", file_suffix, e)
+            self._record_diff(file_suffix, "created", diff_output_file)
+
+    def _record_diff(self, file_suffix: str, status: str, diff_output_file: pathlib.Path | None = None):
+        """Counts a diff outcome and appends its record to the project's diff index."""
+        record = {"file": file_suffix, "status": status,
+                  "diff": str(diff_output_file) if diff_output_file else None}
+        with self._diff_index_lock:
+            self.diff_counts[status] += 1
+            with open(self.diff_dir / DIFF_INDEX_NAME, 'ab') as f:
+                f.write(json_dumps(record) + b"\n")
+
+    @staticmethod
+    def _run_cjd_in_process(older_file: pathlib.Path, newer_file: pathlib.Path, diff_output_file: pathlib.Path,
+                            preset_type: str) -> str | None:
+        """
+        Does what `cjd -i older newer -o diff preset-diff --type preset_type` does, without
+        the subprocess. Runs in a diff worker process, so failures are returned as a
+        message (None on success) for the caller to log.
+        """
+        preset_type = preset_type.lower()
+        if preset_type not in ("bom", "csaf"):
+            return f"preconfigured cjd type must be either bom or csaf, got: {preset_type}"
+        options = custom_diff_classes.Options(preconfig_type=preset_type, file_1=str(older_file),
+                                              file_2=str(newer_file), output=str(diff_output_file))
+        try:
+            _, older, newer = custom_diff.compare_dicts(options)
+            if preset_type == "bom":
+                status, summary = custom_diff.perform_bom_diff(older, newer)
+            else:
+                status, summary = custom_diff.perform_csaf_diff(older, newer)
+            custom_diff.report_results(status, summary, options, older, newer)
+        except (Exception, SystemExit) as e: # cjd exits on unreadable input
+            return repr(e)
+        return None
 
     def _cleanup_container(self):
         """Stops and removes the Docker container."""
-        if self.container:
-            logger.info(f"Cleaning up container '{self.container_name}'...")
+        if self.container and self.container_pool is not None and self.tools_installed_in_container:
+            # The next project only needs a clean scratch area; its own source is mounted already
+            self._exec_in_container(["rm", "-rf", f"{CONTAINER_SCRATCH_ROOT}/{self.project_label}"],
+                                    workdir=CONTAINER_WORKSPACE_MOUNT)
+            self.container_pool.release(self.container_image, self.container)
+            self.container = None
+            self._container_running = False
+        elif self.container:
+            logger.info("Cleaning up container '%s'...", self.container_name)
             try:
-                self.container.reload() # Get fresh status
-                if self.container.status == "running":
-                    self.container.stop(timeout=30)
-                self.container.remove(force=True) # Force remove if stop failed or already stopped
-                logger.info(f"Container '{self.container_name}' stopped and removed.")
+                # The work is done and nothing in the container needs flushing, so skip
+                # stop()'s SIGTERM grace period: a forced remove kills and removes in one call
+                self.container.remove(force=True)
+                logger.info("Container '%s' killed and removed.", self.container_name)
             except docker.errors.NotFound:
-                logger.info(f"Container '{self.container_name}' already removed or not found.")
+                logger.info("Container '%s' already removed or not found.", self.container_name)
             except docker.errors.APIError as e:
-                logger.error(f"Error cleaning up container '{self.container_name}': {e}")
+                logger.error("Error cleaning up container '%s': %s", self.container_name, e)
             finally:
                 self.container = None
+                self._container_running = False
         else:
-            logger.info(f"No active container named '{self.container_name}' to cleanup for this processor instance.")
-
-
-    def process(self) -> bool:
-        """Main processing logic for the project."""
-        logger.info(f"--- Starting processing for project: {self.project_lang}/{self.project_name} ---")
+            logger.info("No active container named '%s' to cleanup for this processor instance.", self.container_name)
+
+
+    def _run_atom_passes(self, compared: set[int]) -> tuple[AtomRunResult, AtomRunResult | None]:
+        """
+        Steps 5/6: runs the atom operations with the JAR and Native versions. They are
+        independent, so by default they run side by side, each with its own scratch dir.
+        Outputs are reused when nothing has changed since the last complete run, or when
+        the same source tree, config and atom versions were analysed before
+        ("cache_results": false always re-runs). Operations diffed while
+        the runs went on are added to compared. The native result is None when it was
+        skipped for lack of a JAR baseline.
+        """
+        stamp = self.project_output_path / OUTPUTS_COMPLETE_STAMP
+        reuse = self.config.get("cache_results", True)
+        if reuse and self._outputs_fresh():
+            logger.info("Atom outputs are newer than the source, config and atom binary; skipping the runs.")
+            fresh = AtomRunResult(ok=True, succeeded=0)
+            return fresh, fresh
+        stamp.unlink(missing_ok=True)
+
+        cache_key = self._results_cache_key() if reuse else None
+        if cache_key and self._restore_cached_results(cache_key):
+            stamp.touch()
+            restored = AtomRunResult(ok=True, succeeded=0)
+            return restored, restored
+
+        self._generate_sbom_if_needed()
+
+        # An operation is diffed as soon as both runs have produced it, overlapping
+        # the diffs with the rest of the atom work; step 7 only picks up the rest
+        ready = queue.SimpleQueue()
+        finished_once, finished_lock = set(), threading.Lock()
+
+        def operation_done(index: int):
+            with finished_lock:
+                both_done = index in finished_once
+                finished_once.add(index)
+            if both_done:
+                ready.put(index)
+
+        with contextlib.ExitStack() as stack:
+            comparer = threading.Thread(target=self._compare_as_ready, args=(ready, compared), daemon=True)
+            comparer.start()
+            stack.callback(comparer.join)
+            stack.callback(ready.put, None)
+
+            if self.config.get("parallel_executables", True):
+                logger.info("=== Running Atom (NPM/JAR and Native %s Versions in parallel) ===", ATOM_NATIVE_EXECUTABLE_NAME)
+                scratch_base = f"{CONTAINER_SCRATCH_ROOT}/{self.project_label}"
+                # Only the native run gets a helper thread; the JAR run stays on this
+                # thread and reuses its already open shell session
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    native_future = executor.submit(self._run_atom_operations_in_thread, ATOM_NATIVE_EXECUTABLE_NAME,
+                                                    self.native_output_dir, f"{scratch_base}/native", operation_done)
+                    jar_result = self._run_atom_operations_in_thread("atom", self.jar_output_dir,
+                                                                     f"{scratch_base}/jar", operation_done)
+                native_result = native_future.result()
+            else:
+                logger.info("=== Running Atom (NPM/JAR Version) ===")
+                jar_result = self._run_atom_operations("atom", self.jar_output_dir, on_operation_done=operation_done)
+                if jar_result.no_baseline:
+                    # Every JAR operation failed; a native run would have nothing to be compared with
+                    logger.error("Skipping native run: no JAR baseline.")
+                    return jar_result, None
+                logger.info("=== Running Atom (Native Version - %s) ===", ATOM_NATIVE_EXECUTABLE_NAME)
+                native_result = self._run_atom_operations(ATOM_NATIVE_EXECUTABLE_NAME, self.native_output_dir,
+                                                          on_operation_done=operation_done)
+
+        if jar_result.ok and native_result.ok:
+            stamp.touch()
+            if cache_key:
+                self._store_cached_results(cache_key)
+        return jar_result, native_result
+
+    def process(self, cleanup: bool = True) -> bool:
+        """
+        Main processing logic for the project.
+        With cleanup=True the container is torn down before returning; with
+        cleanup=False it is left running for the caller to clean up (main does so in
+        the background).
+        """
+        logger.info("--- Starting processing for project: %s ---", self.project_label)
         
         # 0. Create output dirs
         self.project_output_path.mkdir(parents=True, exist_ok=True)
@@ -503,49 +1637,64 @@ class ProjectProcessor:
             logger.error("Failed to clone repository. Aborting project.")
             return False
 
-        # 2. Start Docker container
-        if not self._start_container():
-            logger.error("Failed to start Docker container. Aborting project.")
-            self._cleanup_container() # Attempt cleanup even if start failed partially
-            return False
+        with contextlib.ExitStack() as stack:
+            if cleanup:
+                # 8. Cleanup container, however the steps below end (even if the
+                # start failed partially)
+                stack.callback(self._cleanup_container)
+            try:
+                # 2. Start Docker container
+                if not self._start_container():
+                    logger.error("Failed to start Docker container. Aborting project.")
+                    return False
 
-        try:
-            # 3. Install atom tools in container (once per container lifetime)
-            if not self._install_atom_tools_in_container():
-                logger.error("Failed to install atom tools in container. Aborting project.")
-                return False # No 'finally' here, _cleanup_container will be called by main loop
-
-            # 4. Run project-specific install/build commands
-            if not self._run_project_install_build_in_container():
-                logger.error("Failed to run project install/build commands in container. Aborting project.")
-                return False
+                # Steps 3-6 are mostly short execs; they share one persistent shell session
+                stack.enter_context(self._shell())
 
-            # 5. Run atom operations (JAR version)
-            logger.info("=== Running Atom (NPM/JAR Version) ===")
-            if not self._run_atom_operations("atom", self.jar_output_dir):
-                logger.error("Atom (JAR) operations encountered errors.")
-                # Decide if this is fatal or if we should still try native
-                # For now, continue to try native if JAR fails
-
-            # 6. Run atom operations (Native version)
-            logger.info(f"=== Running Atom (Native Version - {ATOM_NATIVE_EXECUTABLE_NAME}) ===")
-            if not self._run_atom_operations(ATOM_NATIVE_EXECUTABLE_NAME, self.native_output_dir):
-                logger.error(f"Atom ({ATOM_NATIVE_EXECUTABLE_NAME}) operations encountered errors.")
-                # Continue to comparison if some files were generated
-
-            # 7. Compare outputs
-            if not self._compare_outputs():
-                logger.warning("Output comparison step failed or had issues.")
-                # Not necessarily a fatal error for the whole process
-
-            logger.info(f"--- Finished processing for project: {self.project_lang}/{self.project_name} ---")
-            return True
+                # 3. Install atom tools in container (once per container lifetime)
+                if not self._install_atom_tools_in_container():
+                    logger.error("Failed to install atom tools in container. Aborting project.")
+                    return False
 
-        except Exception as e:
-            logger.error(f"An unexpected error occurred during processing of {self.project_name}: {e}", exc_info=True)
-            return False
-        finally:
-            # 8. Cleanup container
-            self._cleanup_container()
+                # 4. Run project-specific install/build commands
+                if not self._run_project_install_build_in_container():
+                    logger.error("Failed to run project install/build commands in container. Aborting project.")
+                    return False
 
+                # 5/6. Run atom operations (JAR and Native versions). The diff index is
+                # started afresh here, since diffs may already begin during the runs.
+                self.diff_dir.mkdir(parents=True, exist_ok=True)
+                (self.diff_dir / DIFF_INDEX_NAME).unlink(missing_ok=True)
+                self.diff_counts.clear()
+                compared: set[int] = set()
+                jar_result, native_result = self._run_atom_passes(compared)
+
+                # Partial failures are not fatal; compare whatever files were generated
+                if not jar_result.ok:
+                    logger.error("Atom (JAR) operations encountered errors.")
+                if native_result is not None and not native_result.ok:
+                    logger.error("Atom (%s) operations encountered errors.", ATOM_NATIVE_EXECUTABLE_NAME)
+                if jar_result.no_baseline:
+                    logger.error("Skipping compare: no JAR baseline.")
+                    return False
 
+                # 7. Compare outputs
+                if not self._compare_outputs(already_compared=compared):
+                    logger.warning("Output comparison step failed or had issues.")
+                    # Not necessarily a fatal error for the whole process
+                if self.diff_counts and logger.isEnabledFor(logging.INFO):
+                    logger.info("Diffs: %s (index: %s)",
+                                ", ".join(f"{count} {status}" for status, count in sorted(self.diff_counts.items())),
+                                self.diff_dir / DIFF_INDEX_NAME)
+
+                logger.info("--- Finished processing for project: %s ---", self.project_label)
+                return True
+
+            except (docker.errors.APIError, subprocess.CalledProcessError, TimeoutError, OSError) as e:
+                # Expected failure modes; a traceback adds nothing unless debugging
+                logger.error("Processing of %s failed: %s", self.project_name, e,
+                             exc_info=logger.isEnabledFor(logging.DEBUG))
+                return False
+            except Exception as e:
+                logger.error("An unexpected error occurred during processing of %s: %s", self.project_name, e, exc_info=True)
+                return False
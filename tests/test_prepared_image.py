@@ -0,0 +1,49 @@
+import pathlib
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("docker")
+
+import docker
+
+import projectProcess
+from projectProcess import ATOM_PREPARED_IMAGE_REPOSITORY, prepared_image_name, start_idle_container
+
+
+def test_tag_changes_with_base_image_id():
+    assert prepared_image_name("sha256:aaa", "native") != prepared_image_name("sha256:bbb", "native")
+
+
+def test_tag_changes_with_native_binary():
+    assert prepared_image_name("sha256:aaa", "native-1") != prepared_image_name("sha256:aaa", "native-2")
+
+
+def test_tag_is_stable_for_the_same_inputs():
+    name = prepared_image_name("sha256:aaa", "native")
+    assert name == prepared_image_name("sha256:aaa", "native")
+    assert name.startswith(f"{ATOM_PREPARED_IMAGE_REPOSITORY}:")
+
+
+def _client_with_images(images: dict[str, str]):
+    """Docker client stub whose images.get knows the given name -> ID mapping."""
+    def get(name):
+        if name not in images:
+            raise docker.errors.ImageNotFound(name)
+        return mock.Mock(id=images[name])
+
+    client = mock.Mock()
+    client.images.get.side_effect = get
+    return client
+
+
+@pytest.mark.parametrize("base_id", ["sha256:old", "sha256:new"])
+def test_start_uses_the_prepared_image_only_for_its_base(base_id):
+    prepared = prepared_image_name("sha256:old", "native")
+    client = _client_with_images({"base:latest": base_id, prepared: "sha256:prepared"})
+
+    with mock.patch.object(projectProcess, "fetch_native_image", return_value=(pathlib.Path("x.tar"), "native")):
+        start_idle_container(client, "base:latest", "c", pathlib.Path("ws"))
+
+    used = client.containers.run.call_args.args[0]
+    assert used == (prepared if base_id == "sha256:old" else "base:latest")
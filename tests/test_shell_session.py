@@ -0,0 +1,116 @@
+import socket
+import struct
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("docker")
+
+from projectProcess import ProjectProcessor, ShellSession, ShellSessionLost
+
+STDOUT, STDERR = 1, 2
+
+
+def _frame(stream: int, payload: bytes) -> bytes:
+    """One frame of docker's multiplexed exec stream."""
+    return struct.pack(">BxxxL", stream, len(payload)) + payload
+
+
+def _fake_shell(sock: socket.socket, frames: list[bytes], hang_up: bool = False):
+    """Reads one command off the socket, then replies with the given frames."""
+    received = b""
+    while b"echo __DONE_1__" not in received:
+        received += sock.recv(65536)
+    for frame in frames:
+        sock.sendall(frame)
+    if hang_up:
+        sock.shutdown(socket.SHUT_RDWR)
+
+
+@pytest.fixture
+def session_pair():
+    ours, theirs = socket.socketpair()
+    session = ShellSession(api_client=None, container_id="test")
+    session._socket = ours
+    yield session, theirs
+    ours.close()
+    theirs.close()
+
+
+def test_run_collects_output_and_exit_code(session_pair):
+    session, theirs = session_pair
+    frames = [_frame(STDOUT, b"hello\n"), _frame(STDERR, b"warn\n"), _frame(STDOUT, b"__DONE_1__ 3\n")]
+    threading.Thread(target=_fake_shell, args=(theirs, frames), daemon=True).start()
+
+    assert session.run("true") == (3, "hello\n", "warn\n")
+
+
+def test_run_finds_marker_split_across_frames(session_pair):
+    session, theirs = session_pair
+    frames = [_frame(STDOUT, b"out\n__DO"), _frame(STDOUT, b"NE_1__ "), _frame(STDOUT, b"0"), _frame(STDOUT, b"\n")]
+    threading.Thread(target=_fake_shell, args=(theirs, frames), daemon=True).start()
+
+    assert session.run("true") == (0, "out\n", "")
+
+
+def test_run_streams_large_output_in_linear_time(session_pair):
+    session, theirs = session_pair
+    chunk = b"x" * 4095 + b"\n"
+    count = (32 << 20) // len(chunk) # 32 MiB in 4 KiB frames
+    frames = [_frame(STDOUT, chunk)] * count + [_frame(STDOUT, b"__DONE_1__ 0\n")]
+    threading.Thread(target=_fake_shell, args=(theirs, frames), daemon=True).start()
+
+    started = time.monotonic()
+    exit_code, stdout, _ = session.run("cat big")
+    elapsed = time.monotonic() - started
+
+    assert exit_code == 0
+    assert len(stdout) == count * len(chunk)
+    # Rescanning the whole buffer per frame took close to a minute at this size
+    assert elapsed < 10
+
+
+def test_run_reports_a_session_lost_after_sending(session_pair):
+    session, theirs = session_pair
+    # The daemon drops the connection mid-command
+    frames = [_frame(STDOUT, b"partial output")]
+    threading.Thread(target=_fake_shell, args=(theirs, frames, True), daemon=True).start()
+
+    with pytest.raises(ShellSessionLost):
+        session.run("npm install")
+
+
+def _processor_with_session(session) -> ProjectProcessor:
+    processor = ProjectProcessor.__new__(ProjectProcessor)
+    processor.container = mock.Mock()
+    processor.container.exec_run.return_value = mock.Mock(output=b"", exit_code=0)
+    processor.container_source_path = "/workspace/src"
+    processor._container_running = True
+    processor._shell_local = threading.local()
+    processor._shell_local.session = session
+    return processor
+
+
+def test_exec_does_not_rerun_a_command_whose_session_broke():
+    session = mock.Mock()
+    session.run.side_effect = ShellSessionLost("ConnectionError: closed")
+    processor = _processor_with_session(session)
+
+    exit_code, _, _ = processor._exec_in_container("rm -rf out && mv tmp out")
+
+    assert exit_code == -1
+    processor.container.exec_run.assert_not_called()
+    session.close.assert_called_once()
+
+
+def test_exec_falls_back_when_the_command_was_never_sent():
+    session = mock.Mock()
+    session.run.side_effect = BrokenPipeError()
+    processor = _processor_with_session(session)
+
+    exit_code, _, _ = processor._exec_in_container("true")
+
+    assert exit_code == 0
+    processor.container.exec_run.assert_called_once()